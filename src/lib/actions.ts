@@ -4,11 +4,13 @@ import type { InitialTimeEntryInput, InitialTimeEntryOutput } from '@/ai/flows/i
 import { initialTimeEntry } from '@/ai/flows/initial-time-entry-prompt';
 import { revalidatePath } from 'next/cache';
 import type { TimeEntry } from '@/types/time-entry';
+import type { AutomationRunSummary } from '@/types/automation-run';
 import type { UserSettings, UserSettingsWithDefaults } from '@/types/settings'; 
 import { defaultUserSettings } from '@/types/settings'; 
 import { parseISO, format } from 'date-fns';
-import { spawnSync } from 'child_process';
+import { spawn, spawnSync } from 'child_process';
 import path from 'path';
+import readline from 'readline';
 import { getAnonymousUserId } from '@/lib/auth';
 import * as db from '@/lib/db'; 
 import { v4 as uuidv4 } from 'uuid';
@@ -71,6 +73,30 @@ interface PythonSubmissionResponse {
   failedEntries: Array<{ client_id: string; error: string }>;
 }
 
+// The result lists every entry's id (and error), so allow for large batches
+const SUBMIT_MAX_OUTPUT_BYTES = 64 * 1024 * 1024;
+
+// With CHRONOASSIST_TRACE=stderr the scripts write timing records to stderr as
+// "PYTHON_TRACE: {json}" lines (see src/scripts/tracing.py); the summary is stored per run.
+const PYTHON_TRACE_PREFIX = 'PYTHON_TRACE: ';
+const pythonTraceEnv = (): NodeJS.ProcessEnv => ({ ...process.env, CHRONOASSIST_TRACE: 'stderr' });
+
+// Returns true if the line was a trace record (stored if it is the run summary).
+function handlePythonTraceLine(userId: string, line: string): boolean {
+  if (!line.startsWith(PYTHON_TRACE_PREFIX)) return false;
+  try {
+    const record = JSON.parse(line.slice(PYTHON_TRACE_PREFIX.length));
+    if (record.type === 'summary') {
+      const summary = record as AutomationRunSummary;
+      console.log(`Python ${summary.script} run ${summary.run} took ${summary.wall_secs}s (${summary.counters.webdriver_calls ?? 0} WebDriver calls).`);
+      db.addAutomationRun(userId, summary);
+    }
+  } catch (traceError) {
+    console.warn('Skipping unparseable trace line from Python script:', line, traceError);
+  }
+  return true;
+}
+
 export async function submitTimeEntriesAction(entriesToSubmit: TimeEntry[]): Promise<{ success: boolean; message: string; hasErrors: boolean; updatedProposals?: TimeEntry[] }> {
   const userId = await getAnonymousUserId();
   db.ensureUserRecordsExist(userId);
@@ -82,18 +108,29 @@ export async function submitTimeEntriesAction(entriesToSubmit: TimeEntry[]): Pro
   console.log("Attempting to submit time entries using Python/Helium script...");
   const pythonScriptPath = path.join(process.cwd(), 'src', 'scripts', 'submit_timesheets.py');
   
-  // Pass the full TimeEntry objects, as the script expects 'id' to be the client_id
-  const entriesJsonString = JSON.stringify(entriesToSubmit);
+  // Pass the full TimeEntry objects, as the script expects 'id' to be the client_id.
+  // They go over stdin as NDJSON rather than argv, which is limited by ARG_MAX.
+  const entriesNdjson = entriesToSubmit.map(entry => JSON.stringify(entry)).join('\n') + '\n';
 
   try {
-    const pythonProcess = spawnSync('python', [pythonScriptPath, entriesJsonString], { encoding: 'utf8', timeout: 300000 });
+    const pythonProcess = spawnSync('python', [pythonScriptPath, '--input', '-'], {
+      input: entriesNdjson,
+      env: pythonTraceEnv(),
+      encoding: 'utf8',
+      timeout: 300000,
+      maxBuffer: SUBMIT_MAX_OUTPUT_BYTES,
+    });
 
     if (pythonProcess.error) {
       console.error('Failed to start Python submission script:', pythonProcess.error);
       return { success: false, message: `Failed to start submission script: ${pythonProcess.error.message}`, hasErrors: true };
     }
 
-    const stderrOutput = pythonProcess.stderr?.toString().trim();
+    const stderrOutput = (pythonProcess.stderr?.toString() ?? '')
+      .split('\n')
+      .filter(line => !handlePythonTraceLine(userId, line))
+      .join('\n')
+      .trim();
     if (stderrOutput) {
         console.log('Python submission script STDERR:', stderrOutput);
     }
@@ -173,66 +210,151 @@ export async function getHistoricalDataAction(): Promise<{ success: boolean; mes
   }
 }
 
+const SCRAPE_TIMEOUT_MS = 300000;
+const HISTORICAL_INSERT_BATCH_SIZE = 50;
+
+type ScrapedEntryMaybeNoHours = Omit<TimeEntry, 'id' | 'Hours'> & { Hours?: number | string };
+
+// Records written by `scrape_timesheets.py --format ndjson`, one per stdout line.
+type ScrapeStreamRecord =
+  | { type: 'entry'; entry: ScrapedEntryMaybeNoHours }
+  | { type: 'progress'; scroll: number; entries: number; earliest_date?: string; elapsed_secs?: number }
+  | { type: 'heartbeat'; elapsed_secs: number }
+  | { type: 'coverage'; viewports: number; rows_seen: number; stop_reason: string | null; complete: boolean; missing_row_indexes: number | null; entries_collected?: number }
+  | { type: 'done'; status: 'ok' | 'error'; entries?: number; error?: string; elapsed_secs?: number };
+
+interface StreamingScrapeResult {
+  startError?: Error;
+  exitCode: number | null;
+  timedOut: boolean;
+  doneRecord: Extract<ScrapeStreamRecord, { type: 'done' }> | null;
+  ingestedCount: number;
+}
+
+function toHistoricalEntry(entry: ScrapedEntryMaybeNoHours, index: number): TimeEntry {
+  return {
+    ...entry,
+    id: `scraped_${Date.now()}_${index}`,
+    Date: entry.Date ? format(parseISO(entry.Date), 'yyyy-MM-dd') : new Date().toISOString().split('T')[0],
+    Hours: 0,
+    Comment: entry.Comment || '',
+    Project: entry.Project || '',
+    Activity: entry.Activity || '',
+    WorkItem: entry.WorkItem || '',
+  };
+}
+
+// Runs the scraper in NDJSON mode and writes entries to user_historical_entries in small
+// batches as they arrive, so memory stays bounded and a timeout or crash keeps the rows
+// that were already scraped.
+function runStreamingScrape(userId: string, days: number): Promise<StreamingScrapeResult> {
+  const pythonScriptPath = path.join(process.cwd(), 'src', 'scripts', 'scrape_timesheets.py');
+  // The incremental checkpoint is kept per user; with nothing stored for this user
+  // (new cookie, reset database) the whole window has to be read.
+  const scriptArgs = [pythonScriptPath, days.toString(), '--format', 'ndjson', '--checkpoint-key', userId];
+  if (db.getLatestHistoricalEntryTimestamp(userId) === null) scriptArgs.push('--full');
+  const pythonProcess = spawn('python', scriptArgs, { env: pythonTraceEnv() });
+
+  const result: StreamingScrapeResult = { exitCode: null, timedOut: false, doneRecord: null, ingestedCount: 0 };
+  let batch: TimeEntry[] = [];
+  let entryIndex = 0;
+
+  const flushBatch = () => {
+    if (batch.length === 0) return;
+    db.addHistoricalEntries(userId, batch);
+    result.ingestedCount += batch.length;
+    batch = [];
+  };
+
+  const timeout = setTimeout(() => {
+    result.timedOut = true;
+    pythonProcess.kill();
+  }, SCRAPE_TIMEOUT_MS);
+
+  readline.createInterface({ input: pythonProcess.stderr }).on('line', line => {
+    if (handlePythonTraceLine(userId, line)) return;
+    console.log('Python script stderr:', line);
+  });
+
+  const stdoutLines = readline.createInterface({ input: pythonProcess.stdout });
+  stdoutLines.on('line', line => {
+    if (!line.trim()) return;
+    let record: ScrapeStreamRecord;
+    try {
+      record = JSON.parse(line);
+    } catch (jsonError) {
+      console.error('Skipping unparseable line from Python script output:', line);
+      return;
+    }
+    if (record.type === 'entry') {
+      try {
+        batch.push(toHistoricalEntry(record.entry, entryIndex++));
+      } catch (entryError) {
+        console.warn('Skipping scraped entry with an invalid date:', record.entry, entryError);
+      }
+      if (batch.length >= HISTORICAL_INSERT_BATCH_SIZE) flushBatch();
+    } else if (record.type === 'progress') {
+      flushBatch();
+      console.log(`Scrape progress: screen ${record.scroll}, ${record.entries} entries so far (earliest ${record.earliest_date ?? 'n/a'}).`);
+    } else if (record.type === 'coverage') {
+      const coverageNote = record.complete ? 'complete' : 'INCOMPLETE';
+      console.log(`Scrape grid coverage (${coverageNote}): ${record.rows_seen} rows in ${record.viewports} screens, stopped by ${record.stop_reason}.`);
+    } else if (record.type === 'done') {
+      result.doneRecord = record;
+    }
+  });
+
+  const stdoutClosed = new Promise<void>(resolve => stdoutLines.on('close', () => resolve()));
+  const processExited = new Promise<void>(resolve => {
+    pythonProcess.on('error', error => {
+      result.startError = error;
+      resolve();
+    });
+    pythonProcess.on('close', code => {
+      result.exitCode = code;
+      resolve();
+    });
+  });
+
+  return Promise.all([stdoutClosed, processExited]).then(() => {
+    clearTimeout(timeout);
+    flushBatch();
+    return result;
+  });
+}
+
 export async function refreshHistoricalDataFromScriptAction(): Promise<{ success: boolean; message: string, data: TimeEntry[] }> {
   const userId = await getAnonymousUserId();
   db.ensureUserRecordsExist(userId); 
   const userSettings = await db.getUserSettings(userId); 
 
   console.log(`Attempting to refresh historical data from script for user ${userId} with ${userSettings.historicalDataDays} days setting...`);
-  const pythonScriptPath = path.join(process.cwd(), 'src', 'scripts', 'scrape_timesheets.py');
   
   try {
-    const pythonProcess = spawnSync('python', [pythonScriptPath, userSettings.historicalDataDays.toString()], { encoding : 'utf8', timeout: 300000 });
+    const scrapeResult = await runStreamingScrape(userId, userSettings.historicalDataDays);
 
-    if (pythonProcess.error) {
-      console.error('Failed to start Python script:', pythonProcess.error);
+    if (scrapeResult.startError) {
+      console.error('Failed to start Python script:', scrapeResult.startError);
       const existingData = db.getHistoricalEntries(userId);
       return { success: false, message: `Python script failed to start. ${existingData.length > 0 ? 'Showing previously loaded data.' : 'No historical data available.'}`, data: existingData };
     }
 
-    const stderrOutput = pythonProcess.stderr?.toString().trim();
-    if (stderrOutput) { 
-      console.log('Python script stderr:', stderrOutput);
-    }
-
-    if (pythonProcess.status !== 0) {
-      const errorMsg = stderrOutput || "Unknown Python script execution error.";
-      console.error(`Python script exited with error code ${pythonProcess.status}:`);
-      console.error('Stderr:', errorMsg);
+    const scriptFailed = scrapeResult.timedOut || scrapeResult.exitCode !== 0 || scrapeResult.doneRecord?.status !== 'ok';
+    if (scriptFailed) {
+      const reason = scrapeResult.timedOut
+        ? 'timed out'
+        : `exited with error code ${scrapeResult.exitCode}${scrapeResult.doneRecord?.error ? ` (${scrapeResult.doneRecord.error})` : ''}`;
+      console.error(`Python script ${reason}. ${scrapeResult.ingestedCount} entries were saved before it stopped.`);
       const existingData = db.getHistoricalEntries(userId);
-      return { success: false, message: `Python script execution error. ${existingData.length > 0 ? 'Showing previously loaded data.' : 'No historical data available.'}`, data: existingData };
+      const partialNote = scrapeResult.ingestedCount > 0 ? `Saved ${scrapeResult.ingestedCount} entries received before it stopped. ` : '';
+      return { success: false, message: `Python script execution error. ${partialNote}${existingData.length > 0 ? 'Showing previously loaded data.' : 'No historical data available.'}`, data: existingData };
     }
 
-    const rawData = pythonProcess.stdout?.toString().trim();
-    if (!rawData) {
-        console.warn('Python script executed successfully but produced no output (stdout is empty).');
+    if (scrapeResult.ingestedCount === 0) {
+        console.warn('Python script executed successfully but returned no entries.');
         const existingData = db.getHistoricalEntries(userId);
         return { success: true, message: `Historical data script ran but returned no new data. ${existingData.length > 0 ? 'Showing previously loaded data.' : 'No historical data available.'}`, data: existingData };
     }
-
-    type ScrapedEntryMaybeNoHours = Omit<TimeEntry, 'id' | 'Hours'> & { Hours?: number | string }; 
-    let scrapedEntries: ScrapedEntryMaybeNoHours[];
-    try {
-        scrapedEntries = JSON.parse(rawData);
-    } catch (jsonError) {
-        console.error("Error parsing JSON from Python script output:", jsonError);
-        console.error("Raw output from Python script:", rawData);
-        const existingData = db.getHistoricalEntries(userId);
-        return { success: false, message: `Failed to parse data from Python script. ${existingData.length > 0 ? 'Showing previously loaded data.' : 'No historical data available.'}`, data: existingData };
-    }
-    
-    const processedScrapedData: TimeEntry[] = scrapedEntries.map((entry, index) => ({
-        ...entry,
-        id: `scraped_${Date.now()}_${index}`, 
-        Date: entry.Date ? format(parseISO(entry.Date), 'yyyy-MM-dd') : new Date().toISOString().split('T')[0],
-        Hours: 0, 
-        Comment: entry.Comment || '',
-        Project: entry.Project || '',
-        Activity: entry.Activity || '',
-        WorkItem: entry.WorkItem || '',
-    }));
-
-    db.addHistoricalEntries(userId, processedScrapedData); 
     
     const allHistoricalData = db.getHistoricalEntries(userId, null); 
 
@@ -240,7 +362,7 @@ export async function refreshHistoricalDataFromScriptAction(): Promise<{ success
         return { success: true, message: "Successfully fetched data, but no time entries were found.", data: [] };
     }
     
-    console.log(`Successfully processed ${processedScrapedData.length} new entries. Total relevant historical entries for user ${userId}: ${allHistoricalData.length}.`);
+    console.log(`Successfully processed ${scrapeResult.ingestedCount} new entries. Total relevant historical entries for user ${userId}: ${allHistoricalData.length}.`);
     revalidatePath('/');
     return { success: true, message: "Historical data fetched and updated successfully.", data: allHistoricalData };
 
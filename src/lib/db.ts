@@ -1,6 +1,7 @@
 import Database from 'better-sqlite3';
 import type { TimeEntry } from '@/types/time-entry';
 import type { UserSettings, UserSettingsWithDefaults } from '@/types/settings'; // New import
+import type { AutomationRunSummary } from '@/types/automation-run';
 import { defaultUserSettings } from '@/types/settings'; // New import
 import crypto from 'crypto';
 import fs from 'node:fs';
@@ -73,6 +74,18 @@ export function initializeDb() {
         DEFERRABLE INITIALLY DEFERRED
     );
     CREATE INDEX IF NOT EXISTS idx_proposed_user_id ON user_proposed_entries(user_id);
+
+    CREATE TABLE IF NOT EXISTS automation_runs (
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      user_id TEXT NOT NULL,
+      run_id TEXT NOT NULL,
+      script TEXT NOT NULL,
+      status TEXT,
+      wall_secs REAL NOT NULL,
+      summary_json TEXT NOT NULL,
+      created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_automation_runs_user_id ON automation_runs(user_id, created_at);
   `);
   dbInitialized = true;
 }
@@ -279,4 +292,12 @@ export function getLatestHistoricalEntryTimestamp(userId: string): string | null
   const stmt = db.prepare('SELECT MAX(created_at) as latest_timestamp FROM user_historical_entries WHERE user_id = ?');
   const result = stmt.get(userId) as { latest_timestamp: string } | undefined;
   return result?.latest_timestamp ?? null;
-}
\ No newline at end of file
+}
+
+export function addAutomationRun(userId: string, summary: AutomationRunSummary): void {
+  const stmt = db.prepare(`
+    INSERT INTO automation_runs (user_id, run_id, script, status, wall_secs, summary_json)
+    VALUES (?, ?, ?, ?, ?, ?)
+  `);
+  stmt.run(userId, summary.run, summary.script, summary.status ?? null, summary.wall_secs, JSON.stringify(summary));
+}
@@ -0,0 +1,219 @@
+# End-to-end benchmark of the scraper and the submitter against the local
+# mock_timesheet_server.py, so every performance change can be measured
+# without the live Dynamics tenant.
+#
+# For each row count the mock workspace is started with that many transaction
+# rows, then scrape_timesheet_data reads the whole grid and submit_entries_to_xyz
+# enters that many entries. Each case runs in a fresh child process with its own
+# temporary home directory, so the real profile, checkpoint, journal and saved
+# login are never touched and peak RSS is measured per case. Reported per case:
+# wall time, WebDriver commands (tracing.py counters), the slowest phases and
+# the peak RSS of the Python process and of the largest browser process.
+#
+# Usage: python bench_automation.py [--rows 100 1000 10000] [--ops scrape submit]
+#            [--submit-mode single] [--extraction-mode js] [--latency-ms 0]
+#            [--render-latency-ms 0] [--headed]
+# Prints one JSON summary to stdout; progress goes to stderr.
+
+import argparse
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from mock_timesheet_server import start_mock_server, PROJECTS, ACTIVITIES, WORK_ITEMS, ROWS_PER_DAY
+
+BENCH_OPS = ("scrape", "submit")
+CASE_TIMEOUT_SECS = 3600
+# Cookie the mock's saved login carries in headless runs
+BENCH_SESSION_COOKIE = {"name": "chronoassist_bench", "value": "1", "path": "/", "session": True}
+TOP_PHASES = 8
+
+
+def log_message(message):
+    print(f"PYTHON_BENCH_LOG: {message}", file=sys.stderr)
+
+
+def build_bench_entries(count, today=None):
+    """Entries for the submitter, spread over the past weeks like a real backlog."""
+    today = today or date.today()
+    entries = []
+    for i in range(count):
+        entries.append({
+            "id": f"bench_{i}",
+            "Date": (today - timedelta(days=1 + i % 28)).isoformat(),
+            "Project": PROJECTS[i % len(PROJECTS)],
+            "Activity": ACTIVITIES[i % len(ACTIVITIES)],
+            "WorkItem": WORK_ITEMS[i % len(WORK_ITEMS)],
+            "Hours": str(1 + i % 4),
+            "Comment": f"Bench entry {i}",
+        })
+    return entries
+
+
+def seed_auth_state(workspace_host):
+    """
+    Writes a saved login for the mock host so the run can start headless. The
+    mock page does not check it, but it makes the run take the same headless
+    path (cookie restore, blocked resources) as a real one.
+    """
+    from chronoassist.auth_state import AUTH_STATE_FILE
+
+    os.makedirs(os.path.dirname(AUTH_STATE_FILE), exist_ok=True)
+    cookie = dict(BENCH_SESSION_COOKIE, domain=workspace_host)
+    with open(AUTH_STATE_FILE, "w", encoding="utf-8") as state_file:
+        json.dump({"captured_at": time.time(), "workspace_host": workspace_host, "cookies": [cookie]}, state_file)
+
+
+def get_peak_rss_mb():
+    """
+    Returns (this process, largest finished child process) peak RSS in MB. The
+    browser processes count as children once they have exited; None where the
+    resource module is unavailable (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return round(own, 1), round(children, 1)
+
+
+def run_case(op, rows, submit_mode="single", extraction_mode="js"):
+    """
+    Runs one benchmark case in this process. Expects the environment set up by
+    run_case_subprocess (target URL, temporary home, browser mode).
+
+    Returns:
+        dict: The case's measurements.
+    """
+    # Imported here: browser_session reads CHRONOASSIST_TARGET_URL and the home
+    # directory at import time, and the parent process never needs Helium.
+    from chronoassist import tracing
+    from chronoassist.browser_session import WORKSPACE_HOST, get_browser_mode
+
+    if get_browser_mode() != "headed":
+        seed_auth_state(WORKSPACE_HOST)
+    tracing.start_run(f"bench.{op}")
+    started = time.perf_counter()
+    status, items, failed = "ok", 0, 0
+    try:
+        if op == "scrape":
+            from chronoassist.scrape_timesheets import scrape_timesheet_data
+
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                scrape_timesheet_data(days_ago=rows // ROWS_PER_DAY + 2, extraction_mode=extraction_mode,
+                                      full_refresh=True, output_format="json")
+            items = len(json.loads(stdout.getvalue() or "[]"))
+        else:
+            from chronoassist.submit_timesheets import submit_entries_to_xyz
+
+            result = submit_entries_to_xyz(build_bench_entries(rows), mode=submit_mode, use_journal=False)
+            items = len(result["submittedEntryClientIds"])
+            failed = len(result["failedEntries"])
+            if "critical error" in result.get("message", ""):
+                status = "error"
+    except SystemExit: # scrape_timesheet_data exits with 1 on a critical error
+        status = "error"
+    wall_secs = time.perf_counter() - started
+
+    run_summary = tracing.finish_run(status=status)
+    phases = sorted(run_summary["phases"].items(), key=lambda item: item[1]["total_secs"], reverse=True)
+    python_rss_mb, browser_rss_mb = get_peak_rss_mb()
+    return {
+        "op": op,
+        "rows": rows,
+        "status": status,
+        "wall_secs": round(wall_secs, 3),
+        "items": items,
+        "failed": failed,
+        "webdriver_calls": run_summary["counters"].get(tracing.WEBDRIVER_CALLS_COUNTER, 0),
+        "top_phases": {name: phase["total_secs"] for name, phase in phases[:TOP_PHASES]},
+        "python_peak_rss_mb": python_rss_mb,
+        "browser_peak_rss_mb": browser_rss_mb,
+    }
+
+
+def run_case_subprocess(op, rows, base_url, args):
+    """Runs one case in a fresh child process with an isolated home directory."""
+    case_home = tempfile.mkdtemp(prefix="chronoassist_bench_")
+    env = dict(os.environ,
+               HOME=case_home, USERPROFILE=case_home,
+               CHRONOASSIST_TARGET_URL=base_url,
+               CHRONOASSIST_NO_DAEMON="1", # Measure this process, not a warm daemon
+               CHRONOASSIST_BROWSER_MODE="headed" if args.headed else "headless")
+    env.pop("CHRONOASSIST_TRACE", None)
+    command = [sys.executable, os.path.abspath(__file__), "--case", op, "--rows", str(rows),
+               "--submit-mode", args.submit_mode, "--extraction-mode", args.extraction_mode]
+    try:
+        completed = subprocess.run(command, env=env, stdout=subprocess.PIPE, stderr=None if args.verbose else subprocess.DEVNULL,
+                                   text=True, timeout=args.case_timeout)
+        lines = completed.stdout.strip().splitlines()
+        if completed.returncode != 0 or not lines:
+            return {"op": op, "rows": rows, "status": "error", "error": f"Case exited with code {completed.returncode}."}
+        return json.loads(lines[-1])
+    except subprocess.TimeoutExpired:
+        return {"op": op, "rows": rows, "status": "error", "error": f"Case timed out after {args.case_timeout}s."}
+    finally:
+        shutil.rmtree(case_home, ignore_errors=True)
+
+
+def run_benchmark(args):
+    results = []
+    for rows in args.rows:
+        server, base_url = start_mock_server(row_count=rows, latency_ms=args.latency_ms,
+                                             render_latency_ms=args.render_latency_ms)
+        try:
+            for op in args.ops:
+                log_message(f"Running {op} with {rows} rows against {base_url}...")
+                with server.state.lock:
+                    server.state.lines.clear()
+                result = run_case_subprocess(op, rows, base_url, args)
+                if op == "submit":
+                    result["lines_recorded"] = len(server.state.lines) # Lines the mock form received
+                log_message(f"{op} x {rows}: {result.get('status')} in {result.get('wall_secs')}s, "
+                            f"{result.get('webdriver_calls')} WebDriver calls.")
+                results.append(result)
+        finally:
+            server.shutdown()
+    return {
+        "submit_mode": args.submit_mode,
+        "extraction_mode": args.extraction_mode,
+        "latency_ms": args.latency_ms,
+        "render_latency_ms": args.render_latency_ms,
+        "headless": not args.headed,
+        "cases": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark scraping and submission against the local mock workspace.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="Transaction rows to scrape and entries to submit per case.")
+    parser.add_argument("--ops", nargs="+", choices=BENCH_OPS, default=list(BENCH_OPS))
+    parser.add_argument("--submit-mode", choices=("single", "batch"), default="single")
+    parser.add_argument("--extraction-mode", choices=("js", "helium"), default="js")
+    parser.add_argument("--latency-ms", type=int, default=0, help="Mock server delay on every GET request.")
+    parser.add_argument("--render-latency-ms", type=int, default=0,
+                        help="Mock page delay before the grid re-renders or a new entry line appears.")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window.")
+    parser.add_argument("--case-timeout", type=int, default=CASE_TIMEOUT_SECS, help="Seconds before a case is abandoned.")
+    parser.add_argument("--verbose", action="store_true", help="Pass the scripts' own logs through to stderr.")
+    parser.add_argument("--case", choices=BENCH_OPS, help=argparse.SUPPRESS) # Set for the child process of one case
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(args.case, args.rows[0], submit_mode=args.submit_mode,
+                                  extraction_mode=args.extraction_mode)))
+    else:
+        print(json.dumps(run_benchmark(args), indent=2))
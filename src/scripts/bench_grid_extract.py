@@ -0,0 +1,85 @@
+# Benchmarks the two grid extraction modes of grid_extract.py against the local
+# fixtures/timesheet_grid.html page, so the speed-up can be measured without the
+# live Dynamics tenant.
+#
+# Usage: python bench_grid_extract.py [--rows 60 300 1000] [--repeat 3] [--headed]
+# Prints one JSON summary to stdout; progress goes to stderr.
+
+from helium import start_chrome, kill_browser, get_driver
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+from chronoassist.grid_extract import extract_visible_rows_js, extract_visible_rows_helium
+from chronoassist import tracing
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "timesheet_grid.html")
+
+
+def log_message(message):
+    print(f"PYTHON_BENCH_LOG: {message}", file=sys.stderr)
+
+
+def webdriver_calls():
+    """WebDriver commands sent so far in this run, as counted by tracing.instrument_driver."""
+    return tracing.summary()["counters"].get(tracing.WEBDRIVER_CALLS_COUNTER, 0)
+
+
+def time_extraction(extract, repeat):
+    durations = []
+    calls_before = webdriver_calls()
+    rows = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = extract()
+        durations.append(time.perf_counter() - started)
+    return rows, {
+        "median_secs": round(statistics.median(durations), 4),
+        "min_secs": round(min(durations), 4),
+        "webdriver_calls_per_run": (webdriver_calls() - calls_before) // repeat,
+    }
+
+
+def run_benchmark(row_counts, repeat=3, headless=True):
+    fixture_url = "file://" + FIXTURE_PATH.replace(os.sep, "/")
+    tracing.start_run("bench_grid_extract")
+    start_chrome(headless=headless)
+    try:
+        driver = get_driver()
+        tracing.instrument_driver(driver)
+        results = []
+        for row_count in row_counts:
+            driver.get(f"{fixture_url}#rows={row_count}")
+            driver.refresh() # A hash-only change doesn't re-render the fixture
+            log_message(f"Fixture loaded with {row_count} rows.")
+
+            js_rows, js_stats = time_extraction(extract_visible_rows_js, repeat)
+            helium_rows, helium_stats = time_extraction(extract_visible_rows_helium, repeat)
+            if js_rows != helium_rows:
+                raise AssertionError(f"Extraction modes disagree for {row_count} rows.")
+
+            speedup = helium_stats["median_secs"] / js_stats["median_secs"] if js_stats["median_secs"] else None
+            results.append({
+                "rows": row_count,
+                "rows_extracted": len(js_rows),
+                "js": js_stats,
+                "helium": helium_stats,
+                "speedup": round(speedup, 1) if speedup else None,
+            })
+            log_message(f"{row_count} rows: js {js_stats['median_secs']}s, helium {helium_stats['median_secs']}s.")
+        return results
+    finally:
+        kill_browser()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark bulk vs per-cell grid extraction on a local fixture.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[60, 300, 1000], help="Fixture row counts to test.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per mode and row count.")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window.")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.rows, repeat=args.repeat, headless=not args.headed), indent=2))
@@ -0,0 +1,46 @@
+# Importable API for the ChronoAssist automation scripts.
+#
+#   import chronoassist
+#   entries, invalid_entries = chronoassist.read_entries("entries.ndjson") # no browser stack loaded
+#   result = chronoassist.submit_entries(entries)                         # Helium/Selenium load here
+#
+# The automation modules (scraper, submitter, session daemon, ...) are
+# submodules of this package; this module gives them one import surface and a
+# CLI (python -m chronoassist, see cli.py). Node.js still runs
+# src/scripts/scrape_timesheets.py and submit_timesheets.py, which only run the
+# matching submodule. Names are resolved on first access, so importing the
+# package costs almost nothing and Helium/Selenium are only imported by calls
+# that drive a browser. Install it with "pip install -e ." from the repository
+# root (pyproject.toml); without installing, run from src/scripts.
+
+import importlib
+
+from chronoassist.dates import parse_entry_date, parse_grid_date, normalize_date, format_grid_date
+
+# Public name -> module that defines it
+_LAZY_ATTRIBUTES = {
+    "read_entries": "chronoassist.entry_input",
+    "collect_entries": "chronoassist.entry_input",
+    "validate_entry": "chronoassist.entry_input",
+    "scrape_timesheet_data": "chronoassist.scrape_timesheets",
+    "collect_timesheet_entries": "chronoassist.scrape_timesheets",
+    "submit_entries": "chronoassist.submit_timesheets",
+    "submit_entries_to_xyz": "chronoassist.submit_timesheets",
+    "submit_entries_in_session": "chronoassist.submit_timesheets",
+    "TimesheetODataClient": "chronoassist.odata_client",
+}
+
+__all__ = ["parse_entry_date", "parse_grid_date", "normalize_date", "format_grid_date", *_LAZY_ATTRIBUTES]
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'chronoassist' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
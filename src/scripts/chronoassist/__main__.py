@@ -0,0 +1,5 @@
+import sys
+
+from chronoassist.cli import main
+
+sys.exit(main())
@@ -0,0 +1,128 @@
+# Captured Azure AD / Dynamics session state for headless runs.
+#
+# After a successful login the browser's cookies for the workspace and the
+# Microsoft login hosts are saved to a file next to the persistent profile.
+# Headless runs load them into the fresh browser before opening the workspace,
+# so they are already signed in and never need the interactive login page.
+# Cookie expiry times are kept, so a stale state is detected before a headless
+# attempt is wasted on it.
+#
+# Usage:
+#   python -m chronoassist auth login  # log in once in a visible browser and save the state
+#   python -m chronoassist auth status # show whether a usable saved state exists
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from chronoassist.browser_session import PROFILE_BASE_DIR, WORKSPACE_HOST, LOGIN_HOST
+
+AUTH_STATE_FILE = os.path.join(PROFILE_BASE_DIR, "auth_state.json")
+# Cookie domains worth keeping: the workspace itself plus the Azure AD hosts
+# that silently renew its tokens.
+AUTH_COOKIE_DOMAINS = (WORKSPACE_HOST, "dynamics.com", LOGIN_HOST, "microsoftonline.com", "login.live.com")
+# Treat cookies that expire within this margin as already expired.
+EXPIRY_MARGIN_SECS = 300
+# Fields accepted by the DevTools Network.setCookies command
+COOKIE_PARAM_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+
+def is_auth_cookie(cookie):
+    domain = (cookie.get("domain") or "").lstrip(".")
+    return any(domain == auth_domain or domain.endswith("." + auth_domain) for auth_domain in AUTH_COOKIE_DOMAINS)
+
+
+def capture_auth_state(driver, path=AUTH_STATE_FILE):
+    """
+    Saves the browser's authentication cookies. Only the owning user may read the file.
+    Parallel workers (parallel_runner.py) save and load it concurrently, so it is
+    written to a temporary file and swapped in atomically.
+
+    Returns:
+        int: The number of cookies saved.
+    """
+    cookies = [cookie for cookie in driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+               if is_auth_cookie(cookie)]
+    state = {"captured_at": time.time(), "workspace_host": WORKSPACE_HOST, "cookies": cookies}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp" # One per process, so concurrent savers don't share it
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as state_file:
+        json.dump(state, state_file)
+    os.replace(temp_path, path) # Readers see the old state or the new one, never half of it
+    return len(cookies)
+
+
+def load_auth_state(path=AUTH_STATE_FILE, now=None):
+    """
+    Returns the saved state if it is for this workspace and not known to be expired, else None.
+    A state counts as expired once every persistent cookie in it has expired; session
+    cookies have no expiry and are judged by whether the workspace accepts them.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as state_file:
+            state = json.load(state_file)
+    except (OSError, ValueError):
+        return None
+    if state.get("workspace_host") != WORKSPACE_HOST or not state.get("cookies"):
+        return None
+    now = time.time() if now is None else now
+    expiries = [cookie["expires"] for cookie in state["cookies"] if not cookie.get("session") and cookie.get("expires", -1) > 0]
+    if expiries and max(expiries) < now + EXPIRY_MARGIN_SECS:
+        return None
+    return state
+
+
+def restore_auth_state(driver, state):
+    """Loads saved cookies into the running browser. Call before navigating to the workspace."""
+    now = time.time()
+    cookies = []
+    for cookie in state["cookies"]:
+        if not cookie.get("session") and 0 < cookie.get("expires", -1) < now:
+            continue # Chrome would drop it anyway
+        cookie_param = {field: cookie[field] for field in COOKIE_PARAM_FIELDS if field in cookie}
+        if cookie.get("session"):
+            cookie_param.pop("expires", None)
+        cookies.append(cookie_param)
+    driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+    return len(cookies)
+
+
+def discard_auth_state(path=AUTH_STATE_FILE):
+    """Removes a state the workspace rejected, so the next run goes straight to a headed login."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def log_message(message):
+    print(f"PYTHON_AUTH_LOG: {message}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Capture or inspect the saved login used by headless runs.")
+    parser.add_argument("command", choices=("login", "status"))
+    args = parser.parse_args()
+
+    if args.command == "login":
+        from chronoassist.browser_session import start_workspace_session, close_session
+        try:
+            # A headed start always ends by saving the state
+            start_workspace_session(log_message, mode="headed")
+        finally:
+            close_session(log_message)
+    state = load_auth_state()
+    if state:
+        expiries = [cookie["expires"] for cookie in state["cookies"] if cookie.get("expires", -1) > 0]
+        print(json.dumps({
+            "usable": True,
+            "cookies": len(state["cookies"]),
+            "captured_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(state["captured_at"])),
+            "expires_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(max(expiries))) if expiries else None,
+        }))
+    else:
+        print(json.dumps({"usable": False}))
+        sys.exit(1)
@@ -0,0 +1,256 @@
+# Shared Chrome/Helium session helpers for the ChronoAssist automation scripts.
+# Used by scrape_timesheets.py, submit_timesheets.py and the long-lived
+# session_daemon.py so they all start, check and close the browser the same way.
+
+# Helium and Selenium are imported inside the functions that drive the browser,
+# so importing this module (e.g. for its constants) stays cheap.
+import os
+from urllib.parse import urlparse
+
+from chronoassist.tracing import span, instrument_driver, enable_performance_log, capture_performance_log
+
+# CHRONOASSIST_TARGET_URL points the scripts at another workspace, e.g. the
+# local mock_timesheet_server.py.
+TARGET_URL = os.environ.get(
+    "CHRONOASSIST_TARGET_URL",
+    "https://bnext-prd.operations.dynamics.com/?cmp=DAT&mi=PSOTSTimesheetUserWorkSpace",
+)
+WORKSPACE_HOST = urlparse(TARGET_URL).hostname or "operations.dynamics.com"
+# Azure AD sends expired sessions back to this host for an interactive login
+LOGIN_HOST = "login.microsoftonline.com"
+
+PROFILE_BASE_DIR = os.path.expanduser("~/.helium_profiles") # Example: C:\Users\YourUser\.helium_profiles or /home/youruser/.helium_profiles
+PROFILE_DIR_NAME = "azure_ad_session"
+
+LOGIN_TIMEOUT_SECS = 200
+# A headless run with valid saved cookies reaches the workspace quickly; past this it is not going to
+HEADLESS_LOGIN_TIMEOUT_SECS = 45
+
+# "auto" runs headless when a saved auth state is available and falls back to a
+# headed (interactive) login when there is none or the workspace rejects it.
+# "headless" never opens a window (fails instead); "headed" always opens one.
+BROWSER_MODE_ENV = "CHRONOASSIST_BROWSER_MODE"
+BROWSER_MODES = ("auto", "headless", "headed")
+# Requests headless runs never need: images, fonts and media
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3",
+]
+# Headless windows can't be maximized; give the grid a desktop-sized viewport instead
+HEADLESS_WINDOW_SIZE = "1920,1080"
+
+
+# Whether the browser Helium is driving was started headless (one browser per process)
+_headless_session = False
+
+# Outcomes of start_headless_session
+HEADLESS_STARTED = "started"
+HEADLESS_LOGIN_REJECTED = "login_rejected" # Azure AD asked for an interactive login
+HEADLESS_FAILED = "failed" # Chrome start error, timeout, ...; says nothing about the saved login
+
+
+class SessionExpiredError(Exception):
+    """The workspace redirected to the Azure AD login page and no interactive login is allowed."""
+
+
+def is_headless_session():
+    """Whether the running browser was started headless."""
+    return _headless_session
+
+
+def get_driver():
+    """Returns Helium's current WebDriver (None when no browser is running)."""
+    from helium import get_driver as get_helium_driver
+    return get_helium_driver()
+
+
+def get_profile_path(profile_dir_name=PROFILE_DIR_NAME):
+    """Returns the persistent Chrome profile path, creating the base directory if needed."""
+    os.makedirs(PROFILE_BASE_DIR, exist_ok=True)
+    return os.path.join(PROFILE_BASE_DIR, profile_dir_name)
+
+
+def get_browser_mode():
+    mode = os.environ.get(BROWSER_MODE_ENV, "auto")
+    return mode if mode in BROWSER_MODES else "auto"
+
+
+def build_chrome_options(profile_path=None, headless=False):
+    """Builds Chrome options that reuse the persistent Azure AD profile."""
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
+
+    driver_options = ChromeOptions()
+    driver_options.add_argument(f"--user-data-dir={profile_path or get_profile_path()}")
+    if headless:
+        driver_options.add_argument(f"--window-size={HEADLESS_WINDOW_SIZE}")
+        driver_options.add_argument("--blink-settings=imagesEnabled=false")
+        driver_options.add_argument("--disable-extensions")
+        driver_options.add_argument("--disable-gpu")
+        driver_options.add_argument("--mute-audio")
+    enable_performance_log(driver_options)
+    return driver_options
+
+
+def block_unneeded_resources(driver):
+    """Stops the browser from downloading images, fonts and media."""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+
+
+def start_workspace_session(log_message, profile_path=None, login_timeout_secs=LOGIN_TIMEOUT_SECS, mode=None):
+    """
+    Starts Chrome with the persistent profile, opens the timesheet workspace and
+    waits for the user to be logged in (the "Time" heading is visible).
+
+    Args:
+        log_message (callable): The calling script's logger.
+        profile_path (str): Chrome user data dir. Defaults to the shared azure_ad_session profile.
+        login_timeout_secs (int): How long to wait for an interactive login.
+        mode (str): "auto", "headless" or "headed" (see BROWSER_MODES). Defaults to
+            CHRONOASSIST_BROWSER_MODE, or "auto".
+
+    Raises:
+        SessionExpiredError: In "headless" mode, when there is no usable saved login.
+        RuntimeError: In "headless" mode, when the headless browser could not be started.
+    """
+    from helium import start_chrome
+    # Imported here: auth_state imports this module's constants
+    from chronoassist.auth_state import load_auth_state, restore_auth_state, capture_auth_state, discard_auth_state
+
+    global _headless_session
+    mode = mode or get_browser_mode()
+    if mode != "headed":
+        auth_state = load_auth_state()
+        if auth_state:
+            outcome = start_headless_session(log_message, auth_state, profile_path, restore_auth_state)
+            if outcome == HEADLESS_STARTED:
+                refresh_saved_auth_state(log_message, capture_auth_state)
+                return
+            if outcome == HEADLESS_LOGIN_REJECTED:
+                # Only a redirect to the login page proves the state is bad; other workers may still be using it
+                discard_auth_state()
+                if mode == "headless":
+                    raise SessionExpiredError("Saved login was rejected by the workspace. Run once with a visible browser to log in again.")
+                log_message("Saved login was rejected. Falling back to an interactive login.")
+            else:
+                if mode == "headless":
+                    raise RuntimeError("The headless browser could not be started; the saved login was kept.")
+                log_message("Headless start failed; the saved login was kept. Falling back to a visible browser.")
+        elif mode == "headless":
+            raise SessionExpiredError("No saved login available. Run once with a visible browser to log in.")
+        else:
+            log_message("No saved login available. Starting a visible browser for the interactive login.")
+
+    log_message("Starting Chrome browser...")
+    # Non-headless: the Azure AD login may need user interaction.
+    with span("chrome_start", headless=False):
+        start_chrome(headless=False, options=build_chrome_options(profile_path))
+    _headless_session = False
+    instrument_driver(get_driver())
+    log_message("Chrome browser started.")
+    return_to_workspace(log_message, login_timeout_secs=login_timeout_secs)
+    refresh_saved_auth_state(log_message, capture_auth_state)
+
+
+def start_headless_session(log_message, auth_state, profile_path, restore_auth_state):
+    """
+    Starts a headless browser with the saved cookies and opens the workspace.
+
+    Returns:
+        str: HEADLESS_STARTED when the workspace accepted the login; HEADLESS_LOGIN_REJECTED
+        when Azure AD asked for an interactive login; HEADLESS_FAILED when Chrome or the
+        workspace failed for another reason. The browser is closed unless it started.
+    """
+    from helium import start_chrome
+
+    global _headless_session
+    log_message("Starting headless Chrome browser with the saved login...")
+    try:
+        with span("chrome_start", headless=True):
+            start_chrome(headless=True, options=build_chrome_options(profile_path, headless=True))
+        _headless_session = True
+        driver = get_driver()
+        instrument_driver(driver)
+        block_unneeded_resources(driver)
+        log_message(f"Restored {restore_auth_state(driver, auth_state)} saved cookies.")
+        return_to_workspace(log_message, login_timeout_secs=HEADLESS_LOGIN_TIMEOUT_SECS)
+        return HEADLESS_STARTED
+    except SessionExpiredError as e_expired:
+        log_message(f"Headless login failed: {e_expired}")
+        outcome = HEADLESS_LOGIN_REJECTED
+    except Exception as e_headless:
+        log_message(f"Headless start failed: {e_headless}")
+        outcome = HEADLESS_FAILED
+    close_session(log_message)
+    return outcome
+
+
+def refresh_saved_auth_state(log_message, capture_auth_state):
+    """Re-saves the session cookies after a successful login; Azure AD rotates them."""
+    try:
+        log_message(f"Saved {capture_auth_state(get_driver())} session cookies for headless runs.")
+    except Exception as e_capture:
+        log_message(f"Could not save the login for headless runs: {e_capture}")
+
+
+def return_to_workspace(log_message, login_timeout_secs=LOGIN_TIMEOUT_SECS):
+    """
+    Navigates the already-running browser back to the timesheet workspace landing page.
+
+    Raises:
+        SessionExpiredError: If a headless browser is sent to the Azure AD login page.
+    """
+    from helium import go_to, wait_until, Text
+
+    log_message(f"Navigating to {TARGET_URL}")
+    with span("navigate_workspace"):
+        go_to(TARGET_URL)
+    # Returns as soon as the page shows "Time", so this is only long when a login is needed
+    with span("login_wait"):
+        if _headless_session:
+            # Nobody can type a password into a headless browser; give up at the login page
+            wait_until(lambda: Text("Time").exists() or get_session_status() == "expired",
+                       timeout_secs=login_timeout_secs)
+            if get_session_status() == "expired":
+                raise SessionExpiredError("Azure AD asked for an interactive login.")
+        else:
+            wait_until(Text("Time").exists, timeout_secs=login_timeout_secs)
+
+
+
+def get_session_status():
+    """
+    Cheap health check of the current browser session.
+
+    Returns:
+        str: "stopped" when no browser is running (or it stopped responding),
+             "expired" when Azure AD redirected to the login page,
+             "ready" when the browser is on the Dynamics workspace,
+             "unknown" for any other page.
+    """
+    try:
+        driver = get_driver()
+        if driver is None:
+            return "stopped"
+        current_url = driver.current_url or ""
+    except Exception:
+        return "stopped"
+    if LOGIN_HOST in current_url:
+        return "expired"
+    if WORKSPACE_HOST in current_url:
+        return "ready"
+    return "unknown"
+
+
+def close_session(log_message):
+    """Closes the browser, logging instead of raising on failure."""
+    log_message("Attempting to close browser.")
+    try:
+        from helium import kill_browser
+
+        capture_performance_log(get_driver())
+        kill_browser() # Helium's function to close the browser
+        log_message("Browser closed.")
+    except Exception as e_close:
+        log_message(f"Error closing browser: {e_close}")
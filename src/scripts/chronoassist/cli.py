@@ -0,0 +1,100 @@
+# Command-line entry point: python -m chronoassist <command> [args], or the
+# chronoassist console script after "pip install -e ." (see pyproject.toml).
+#
+# "validate" and "date" are fast paths that never import the browser stack.
+# Every other command runs the matching script as if it had been started
+# directly, with the remaining arguments, e.g.
+#   python -m chronoassist validate --input entries.ndjson
+#   python -m chronoassist submit --input - --mode batch < entries.ndjson
+#   python -m chronoassist scrape 30 --format ndjson
+
+import argparse
+import json
+import runpy
+import sys
+
+# Command -> (script module, help)
+SCRIPT_COMMANDS = {
+    "scrape": ("chronoassist.scrape_timesheets", "Scrape historical timesheet transactions (scrape_timesheets.py)."),
+    "submit": ("chronoassist.submit_timesheets", "Submit time entries (submit_timesheets.py)."),
+    "daemon": ("chronoassist.session_daemon", "Run or control the warm browser session daemon (session_daemon.py)."),
+    "parallel": ("chronoassist.parallel_runner", "Scrape or submit with several browsers at once (parallel_runner.py)."),
+    "auth": ("chronoassist.auth_state", "Save or inspect the login used by headless runs (auth_state.py)."),
+    "odata": ("chronoassist.odata_client", "Fetch transactions over OData (odata_client.py)."),
+}
+
+
+def log_message(message):
+    print(f"PYTHON_CLI_LOG: {message}", file=sys.stderr)
+
+
+def run_script(command, script_args):
+    """Runs a script module as __main__ with script_args as its command line."""
+    module_name = SCRIPT_COMMANDS[command][0]
+    sys.argv = [f"chronoassist {command}", *script_args]
+    runpy.run_module(module_name, run_name="__main__", alter_sys=True)
+
+
+def validate_command(args):
+    """Validates entries and normalizes their dates without starting a browser. Returns the exit code."""
+    from chronoassist.entry_input import read_entries
+
+    try:
+        entries, invalid_entries = read_entries(args.input)
+    except (OSError, ValueError) as e_input:
+        log_message(f"Could not read entries: {e_input}")
+        return 2
+    if args.emit_entries:
+        for entry in entries:
+            print(json.dumps(entry))
+        if invalid_entries:
+            log_message(f"{len(invalid_entries)} invalid entries: {json.dumps(invalid_entries)}")
+    else:
+        print(json.dumps({"validEntries": len(entries), "invalidEntries": invalid_entries}))
+    return 1 if invalid_entries else 0
+
+
+def date_command(args):
+    """Prints the entry and grid forms of each date. Returns the exit code."""
+    from chronoassist.dates import normalize_date, parse_entry_date, format_grid_date
+
+    exit_code = 0
+    for value in args.dates:
+        try:
+            normalized = normalize_date(value)
+            print(json.dumps({"input": value, "date": normalized, "grid": format_grid_date(parse_entry_date(normalized))}))
+        except ValueError as e_date:
+            print(json.dumps({"input": value, "error": str(e_date)}))
+            exit_code = 1
+    return exit_code
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="chronoassist", description="ChronoAssist timesheet automation.")
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    validate_parser = subparsers.add_parser("validate", help="Check entries and normalize their dates; no browser.")
+    validate_parser.add_argument("--input", default="-", metavar="PATH",
+                                 help="JSON array or NDJSON of entries; '-' (default) reads stdin.")
+    validate_parser.add_argument("--emit-entries", action="store_true",
+                                 help="Print the valid, normalized entries as NDJSON instead of a summary.")
+    date_parser = subparsers.add_parser("date", help="Normalize dates and show how the entry grid writes them.")
+    date_parser.add_argument("dates", nargs="+", metavar="DATE", help="YYYY-MM-DD or M/D/YYYY.")
+    # Listed for --help only; main() hands these to the scripts before argparse sees them
+    for command, (_, help_text) in SCRIPT_COMMANDS.items():
+        subparsers.add_parser(command, help=help_text, add_help=False)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in SCRIPT_COMMANDS:
+        run_script(argv[0], argv[1:])
+        return 0
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "validate":
+        return validate_command(args)
+    if args.command == "date":
+        return date_command(args)
+    parser.print_help(sys.stderr)
+    return 2
@@ -0,0 +1,81 @@
+# Client side of the session daemon line protocol (see session_daemon.py).
+# scrape_timesheets.py and submit_timesheets.py use this to hand their job to a
+# running daemon so the warm, already-logged-in browser is reused.
+
+import json
+import os
+import socket
+
+from chronoassist.browser_session import PROFILE_BASE_DIR
+from chronoassist.tracing import merge_summary
+
+# Written by session_daemon.py on start-up, removed on shutdown.
+DAEMON_STATE_FILE = os.path.join(PROFILE_BASE_DIR, "session_daemon.json")
+DAEMON_HOST = "127.0.0.1"
+CONNECT_TIMEOUT_SECS = 2
+# Set to "1" to always run a fresh local browser even when a daemon is up.
+DISABLE_DAEMON_ENV = "CHRONOASSIST_NO_DAEMON"
+
+
+def read_daemon_state():
+    """Returns the running daemon's {"port", "pid", "token"} record, or None."""
+    try:
+        with open(DAEMON_STATE_FILE, "r", encoding="utf-8") as state_file:
+            return json.load(state_file)
+    except (OSError, ValueError):
+        return None
+
+
+def send_request(op, params=None, timeout_secs=None, state=None, on_stream=None):
+    """
+    Sends one request to the daemon and waits for its final response line.
+    Interim {"stream": record} lines (streamed scrape records) are passed to on_stream.
+
+    Raises:
+        OSError: if no daemon is listening or the connection drops.
+    """
+    state = state or read_daemon_state()
+    if not state:
+        raise ConnectionRefusedError("No session daemon state file found.")
+    request = {"op": op, "params": params or {}, "token": state.get("token")}
+    with socket.create_connection((DAEMON_HOST, state["port"]), timeout=CONNECT_TIMEOUT_SECS) as conn:
+        conn.settimeout(timeout_secs) # Jobs can legitimately take minutes
+        conn.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        with conn.makefile("r", encoding="utf-8") as reader:
+            for line in reader:
+                response = json.loads(line)
+                if "stream" not in response:
+                    return response
+                if on_stream:
+                    on_stream(response["stream"])
+    raise ConnectionResetError("Session daemon closed the connection without a response.")
+
+
+def run_via_daemon(op, params, log_message, on_stream=None):
+    """
+    Runs a job on the session daemon if one is reachable.
+
+    Returns:
+        dict: The daemon's {"ok", "result" | "error"} response, or
+        None when no daemon is available and the caller should run locally.
+    """
+    if os.environ.get(DISABLE_DAEMON_ENV) == "1":
+        return None
+    state = read_daemon_state()
+    if not state:
+        return None
+    try:
+        send_request("ping", state=state, timeout_secs=CONNECT_TIMEOUT_SECS)
+    except (OSError, ValueError) as e_ping:
+        log_message(f"Session daemon not reachable ({e_ping}). Running with a fresh browser.")
+        return None
+    log_message(f"Sending '{op}' job to session daemon on port {state['port']}.")
+    try:
+        response = send_request(op, params, state=state, on_stream=on_stream)
+    except (OSError, ValueError) as e_job:
+        # The daemon may still own the Chrome profile, so don't start a second browser on it.
+        return {"ok": False, "error": f"Lost connection to session daemon: {e_job}"}
+    # The daemon did the browser work, so its timings belong in this run's summary
+    if response.get("trace"):
+        merge_summary(response.pop("trace"))
+    return response
@@ -0,0 +1,75 @@
+# Pure-Python date handling for entries and the timesheet grid.
+#
+# Entries carry dates as "YYYY-MM-DD"; the transactions grid shows "M/D/YYYY"
+# and the entry grid expects "Tue 5/13". These helpers convert between them
+# without strptime/strftime: strptime is slow per row (regex and locale
+# lookups), "%a" follows the machine's locale rather than the grid's English,
+# and "%#m" (month without a leading zero) only means that on Windows. glibc
+# treats "#" as a case flag and still zero-pads ("Sat 05/03" for May 3), and
+# other C libraries differ again, so the Date field got text the grid's own
+# format does not use.
+
+from datetime import date
+
+ENTRY_DATE_LENGTH = len("YYYY-MM-DD")
+WEEKDAY_ABBREVIATIONS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+def parse_entry_date(value):
+    """
+    Parses an entry's "YYYY-MM-DD" date. A time part, as in "2025-05-13T12:00:00Z", is ignored.
+
+    Raises:
+        ValueError: "Date is missing." or "Invalid date format: <value>".
+    """
+    if value is None or str(value).strip() == "":
+        raise ValueError("Date is missing.")
+    text = str(value).strip()
+    day_part = text[:ENTRY_DATE_LENGTH]
+    if (len(text) > ENTRY_DATE_LENGTH and text[ENTRY_DATE_LENGTH] not in "T ") or len(day_part) != ENTRY_DATE_LENGTH:
+        raise ValueError(f"Invalid date format: {value}")
+    year, month, day = day_part[0:4], day_part[5:7], day_part[8:10]
+    if day_part[4] != "-" or day_part[7] != "-" or not (year + month + day).isdigit():
+        raise ValueError(f"Invalid date format: {value}")
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        raise ValueError(f"Invalid date format: {value}") from None
+
+
+def parse_grid_date(text):
+    """Parses a grid Date cell ("5/13/2025" or "2025-05-13"). Returns None when it is not a date."""
+    text = (text or "").strip()
+    parts = text.split("/")
+    if len(parts) == 3:
+        month, day, year = parts
+        if not (month.isdigit() and day.isdigit() and year.isdigit() and len(year) == 4):
+            return None
+        try:
+            return date(int(year), int(month), int(day))
+        except ValueError:
+            return None
+    try:
+        return parse_entry_date(text)
+    except ValueError:
+        return None
+
+
+def normalize_date(value):
+    """
+    Returns the "YYYY-MM-DD" form of an entry or grid date.
+
+    Raises:
+        ValueError: As parse_entry_date, if the value is neither.
+    """
+    if value is not None and "/" in str(value):
+        grid_date = parse_grid_date(str(value))
+        if grid_date is None:
+            raise ValueError(f"Invalid date format: {value}")
+        return grid_date.isoformat()
+    return parse_entry_date(value).isoformat()
+
+
+def format_grid_date(date_obj):
+    """Formats a date the way the entry grid shows it, e.g. "Tue 5/13", on every platform and locale."""
+    return f"{WEEKDAY_ABBREVIATIONS[date_obj.weekday()]} {date_obj.month}/{date_obj.day}"
@@ -0,0 +1,144 @@
+# Streaming reader for the TimeEntry payload given to submit_timesheets.py.
+#
+# Entries used to arrive as one command-line argument, which runs into the OS
+# ARG_MAX limit on large batches and puts the whole payload in the process
+# table. They are now read from stdin or a file, as either a JSON array or
+# NDJSON (one entry per line), in fixed-size chunks. Each entry is decoded and
+# validated as soon as it is complete, so memory use does not grow with the
+# size of the text and a bad entry is reported without rejecting the rest.
+
+import json
+import sys
+
+from chronoassist.dates import normalize_date
+
+READ_CHUNK_CHARS = 64 * 1024
+# Fields every TimeEntry must carry before it is worth opening the browser for.
+# WorkItem is optional: the UI leaves it empty and the form accepts that.
+REQUIRED_ENTRY_FIELDS = ("id", "Date", "Project", "Activity", "Hours")
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+def iter_json_values(stream, chunk_chars=READ_CHUNK_CHARS):
+    """
+    Yields the values of a JSON array, or of an NDJSON / concatenated JSON stream,
+    one at a time while reading the stream in chunks.
+
+    Raises:
+        ValueError: If the text is not a JSON array or a sequence of JSON values.
+    """
+    buffer = ""
+    position = 0 # Index into buffer of the next unread character
+    consumed = 0 # Characters dropped from the front of buffer, for error offsets
+    at_eof = False
+    in_array = None # Decided by the first non-whitespace character
+    expect_separator = False
+    after_comma = False # A ']' right after ',' is a trailing comma, which JSON does not allow
+
+    def fill():
+        nonlocal buffer, position, consumed, at_eof
+        chunk = stream.read(chunk_chars)
+        if not chunk:
+            at_eof = True
+            return
+        consumed += position
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    while True:
+        while position < len(buffer) and buffer[position] in _WHITESPACE:
+            position += 1
+        if position >= len(buffer):
+            if at_eof:
+                break
+            fill()
+            continue
+
+        char = buffer[position]
+        if in_array is None:
+            in_array = char == "["
+            if in_array:
+                position += 1
+                continue
+        if in_array and char == "]":
+            if after_comma:
+                raise ValueError(f"Unexpected ']' after ',' at character {consumed + position}.")
+            position += 1
+            in_array = False # Anything after the closing bracket is an error
+            expect_separator = None
+            continue
+        if expect_separator is None:
+            raise ValueError(f"Unexpected data after the end of the array at character {consumed + position}.")
+        if in_array and expect_separator:
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' at character {consumed + position}.")
+            position += 1
+            expect_separator = False
+            after_comma = True
+            continue
+
+        try:
+            value, end = _decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as e_decode:
+            if at_eof:
+                raise ValueError(f"Invalid JSON at character {consumed + e_decode.pos}: {e_decode.msg}") from None
+            fill() # The value may just be cut off at the chunk boundary
+            continue
+        if end == len(buffer) and not at_eof and not isinstance(value, (dict, list, str)):
+            fill() # A bare number or literal may continue in the next chunk
+            continue
+        position = end
+        expect_separator = in_array
+        after_comma = False
+        yield value
+
+    if in_array:
+        raise ValueError("Unexpected end of input inside the entries array.")
+
+
+def validate_entry(entry):
+    """Returns an error message for an unusable entry, or None when it can be submitted."""
+    if not isinstance(entry, dict):
+        return f"Entry must be a JSON object, got {type(entry).__name__}."
+    missing = [field for field in REQUIRED_ENTRY_FIELDS if entry.get(field) in (None, "")]
+    if missing:
+        return f"Entry is missing required fields: {', '.join(missing)}."
+    try:
+        normalize_date(entry["Date"])
+    except ValueError as e_date:
+        return str(e_date)
+    return None
+
+
+def read_entries(source):
+    """
+    Reads and validates entries from a path, or from stdin when source is "-".
+
+    Returns:
+        tuple: (entries, invalid_entries), where invalid_entries are failedEntries
+        records ({"client_id", "error"}) for entries that failed validation.
+
+    Raises:
+        ValueError: If the input is not valid JSON / NDJSON.
+    """
+    if source == "-":
+        return collect_entries(sys.stdin)
+    with open(source, "r", encoding="utf-8") as input_file:
+        return collect_entries(input_file)
+
+
+def collect_entries(stream):
+    """Splits the stream's entries into (entries, invalid_entries); see read_entries."""
+    entries = []
+    invalid_entries = []
+    for index, entry in enumerate(iter_json_values(stream)):
+        error = validate_entry(entry)
+        if error:
+            client_id = entry.get('id') if isinstance(entry, dict) and entry.get('id') else f"unknown_id_{index}"
+            invalid_entries.append({"client_id": client_id, "error": f"Invalid entry: {error}"})
+        else:
+            entry["Date"] = normalize_date(entry["Date"]) # "5/13/2025" -> "2025-05-13"; ISO dates are unchanged
+            entries.append(entry)
+    return entries, invalid_entries
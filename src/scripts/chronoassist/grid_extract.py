@@ -0,0 +1,98 @@
+# Reads the visible rows of the Timesheet transactions grid.
+#
+# The "js" mode pulls every visible row in a single execute_script call and
+# returns compact (Date, Project, Activity, WorkItem, Comment) tuples, plus each
+# row's identity and the grid's row count and sort for the scroller
+# (grid_scroller.py). The "helium" mode is the original find_all + get_attribute path, which costs
+# roughly 5 x rows WebDriver round trips per screen; it is kept as a fallback
+# for when the injected script can't make sense of the page.
+
+import sys
+
+from chronoassist.browser_session import get_driver
+
+EXTRACTION_MODES = ("js", "helium")
+
+# aria-labels of the grid inputs, in the order the row tuples use
+GRID_COLUMN_LABELS = ("Date", "Project", "Activity", "Work item", "External comment")
+
+# Pairs each Date input with the other inputs of its grid row. Rows are found
+# through the closest [role=row] ancestor; if the grid has no row roles the
+# columns are zipped by index, which is what the Helium path does. Returns the
+# rows as [identity, Date, Project, Activity, WorkItem, Comment], where identity
+# is the row's aria-rowindex or row id (null without a row element), plus the
+# grid's declared row count and the Date column's sort.
+EXTRACT_ROWS_SCRIPT = """
+var labels = arguments[0];
+var valueOf = function (el) { return el ? (el.value || '').trim() : ''; };
+var dateInputs = document.querySelectorAll("input[aria-label='" + labels[0] + "']");
+var rows = [];
+var byIndex = null;
+for (var i = 0; i < dateInputs.length; i++) {
+    var rowEl = dateInputs[i].closest("[role='row']");
+    var identity = rowEl ? (rowEl.getAttribute('aria-rowindex') || rowEl.getAttribute('data-dyn-row-id') || rowEl.id || null) : null;
+    var row = [identity, valueOf(dateInputs[i])];
+    for (var c = 1; c < labels.length; c++) {
+        var selector = "input[aria-label='" + labels[c] + "']";
+        if (rowEl) {
+            row.push(valueOf(rowEl.querySelector(selector)));
+        } else {
+            if (!byIndex) { byIndex = {}; }
+            if (!byIndex[c]) { byIndex[c] = document.querySelectorAll(selector); }
+            row.push(valueOf(byIndex[c][i]));
+        }
+    }
+    rows.push(row);
+}
+var grid = dateInputs.length ? dateInputs[0].closest("[role='grid']") : null;
+var sort = null;
+var headers = document.querySelectorAll("[role='columnheader'][aria-sort]");
+for (var h = 0; h < headers.length; h++) {
+    var headerText = (headers[h].getAttribute('aria-label') || headers[h].textContent || '').trim();
+    if (headerText === labels[0]) { sort = headers[h].getAttribute('aria-sort'); }
+}
+return {
+    rows: rows,
+    totalRows: grid ? (parseInt(grid.getAttribute('aria-rowcount'), 10) || null) : null,
+    sort: sort
+};
+"""
+
+
+def log_message(message):
+    print(f"PYTHON_SCRIPT_LOG: {message}", file=sys.stderr)
+
+
+def extract_viewport_js():
+    """
+    Reads the visible grid rows with one injected script call.
+
+    Returns:
+        dict: {"rows": [(identity, row_tuple), ...], "totalRows": int | None, "sort": str | None}.
+    """
+    viewport = get_driver().execute_script(EXTRACT_ROWS_SCRIPT, list(GRID_COLUMN_LABELS))
+    if viewport is None:
+        raise ValueError("Row extraction script returned no data.")
+    viewport["rows"] = [(row[0], tuple(row[1:])) for row in viewport["rows"]]
+    return viewport
+
+
+def extract_visible_rows_js():
+    """Returns the visible grid rows as tuples using one injected script call."""
+    return [row for _, row in extract_viewport_js()["rows"]]
+
+
+def extract_visible_rows_helium():
+    """Returns the visible grid rows as tuples using per-cell Helium lookups."""
+    from helium import S, find_all
+
+    columns = [find_all(S(f"input[aria-label='{label}']")) for label in GRID_COLUMN_LABELS]
+    date_cells = columns[0]
+    rows = []
+    for row_idx, dates_el in enumerate(date_cells):
+        row = [dates_el.web_element.get_attribute('value').strip()]
+        for cells in columns[1:]:
+            row.append(cells[row_idx].web_element.get_attribute('value').strip() if row_idx < len(cells) else "")
+        rows.append(tuple(row))
+    return rows
+
@@ -0,0 +1,208 @@
+# Scrolling engine for the virtualized Timesheet transactions grid.
+#
+# Dynamics only renders the rows near the viewport, so the rows in the DOM
+# change as the grid scrolls. Each pass reads the rendered rows with their
+# identity (aria-rowindex, or a row id) in one script call, keeps only rows it
+# has not seen before, then scrolls the grid's own scroll container by exactly
+# one viewport height. Scanning stops at the end of the grid, or as soon as the
+# cutoff date is passed when the Date column header says the grid is sorted
+# newest first. An order inferred from the dates read so far proves nothing
+# about the rows not yet rendered, so without the header the whole grid is
+# read. The coverage record says how the scan ended and whether any rows were
+# skipped; a grid that never showed a row does not count as complete, since it
+# may simply not have rendered yet.
+
+from datetime import datetime
+import sys
+
+from chronoassist.browser_session import get_driver
+from chronoassist.dates import parse_grid_date as parse_grid_day
+from chronoassist.grid_extract import GRID_COLUMN_LABELS, extract_viewport_js, extract_visible_rows_helium
+from chronoassist.readiness import wait_for_page_settled
+from chronoassist.tracing import span, count
+
+# Safety net only; a scan normally ends at the cutoff or the end of the grid
+MAX_VIEWPORTS = 5000
+# Consecutive scrolls that reveal no new rows before the grid counts as stuck
+MAX_STALLED_VIEWPORTS = 3
+
+# Locates the grid's scroll container from the first Date input: the nearest
+# ancestor that actually scrolls, or the document itself.
+SCROLL_PARENT_JS = """
+function scrollParent(el) {
+    for (var node = el && el.parentElement; node; node = node.parentElement) {
+        var overflowY = getComputedStyle(node).overflowY;
+        if ((overflowY === 'auto' || overflowY === 'scroll') && node.scrollHeight > node.clientHeight) { return node; }
+    }
+    return document.scrollingElement || document.documentElement;
+}
+"""
+
+# Scrolls the grid container down by one viewport height.
+SCROLL_VIEWPORT_SCRIPT = SCROLL_PARENT_JS + """
+var container = scrollParent(document.querySelector("input[aria-label='" + arguments[0] + "']"));
+var before = container.scrollTop;
+container.scrollTop = before + container.clientHeight;
+return container.scrollTop - before;
+"""
+
+
+def log_message(message):
+    print(f"PYTHON_SCRIPT_LOG: {message}", file=sys.stderr)
+
+
+def parse_grid_date(date_str):
+    """Parses a grid Date cell to a midnight datetime. Returns None when the text is not a recognised date."""
+    day = parse_grid_day(date_str)
+    return datetime(day.year, day.month, day.day) if day else None
+
+
+def read_viewport(extraction_mode="js"):
+    """
+    Reads the rendered rows, the grid's row count and its Date sort order.
+    In "helium" mode rows are read cell by cell and have no identity, so they are
+    told apart by content.
+    """
+    if extraction_mode == "js":
+        try:
+            return extract_viewport_js()
+        except Exception as e_js:
+            log_message(f"Bulk row extraction failed ({e_js}). Falling back to Helium cell lookups.")
+    return {"rows": [(None, row) for row in extract_visible_rows_helium()], "totalRows": None, "sort": None}
+
+
+def scroll_one_viewport():
+    """Scrolls the grid by one viewport. Returns how many pixels it moved (0 at the end)."""
+    return get_driver().execute_script(SCROLL_VIEWPORT_SCRIPT, GRID_COLUMN_LABELS[0]) or 0
+
+
+class SortOrderTracker:
+    """Infers the grid's date order from the dates seen so far, in grid order."""
+
+    def __init__(self):
+        self.last_date = None
+        self.non_increasing = True
+        self.non_decreasing = True
+
+    def add(self, date_obj):
+        if self.last_date is not None:
+            self.non_increasing = self.non_increasing and date_obj <= self.last_date
+            self.non_decreasing = self.non_decreasing and date_obj >= self.last_date
+        self.last_date = date_obj
+
+    def order(self):
+        """"descending", "ascending", "unsorted" or None (not enough distinct dates yet)."""
+        if self.non_increasing and self.non_decreasing:
+            return None
+        if self.non_increasing:
+            return "descending"
+        return "ascending" if self.non_decreasing else "unsorted"
+
+
+def new_coverage():
+    return {
+        "viewports": 0,
+        "rows_seen": 0,
+        "rows_before_cutoff": 0,
+        "unparsed_dates": 0,
+        "stalled_viewports": 0,
+        "total_rows": None,
+        "missing_row_indexes": None,
+        "sort_order": None,
+        "sort_order_source": None,
+        "stop_reason": None,
+        "complete": False,
+    }
+
+
+def iter_grid_viewports(coverage, extraction_mode="js", cutoff_date=None, max_viewports=MAX_VIEWPORTS):
+    """
+    Scans the grid one viewport at a time.
+
+    Args:
+        coverage (dict): From new_coverage(); updated in place as the scan runs.
+        extraction_mode (str): "js" or "helium" (see grid_extract.py).
+        cutoff_date (datetime): Rows older than this are not wanted. When the header sorts
+            the grid newest first the scan stops once it passes the cutoff; otherwise it
+            reads to the end.
+        max_viewports (int): Safety limit on the number of viewports read.
+
+    Yields:
+        list: (values, date_obj) for each row not seen in an earlier viewport, in grid
+        order; values is the (Date, Project, Activity, WorkItem, Comment) tuple and
+        date_obj is None when the Date cell could not be parsed.
+    """
+    seen_identities = set()
+    row_indexes = set()
+    sort_tracker = SortOrderTracker()
+    stalled = 0
+
+    while True:
+        if coverage["viewports"] >= max_viewports:
+            coverage["stop_reason"] = "max_viewports"
+            break
+        with span("grid_extract", viewport=coverage["viewports"] + 1, mode=extraction_mode):
+            viewport = read_viewport(extraction_mode)
+        coverage["viewports"] += 1
+        coverage["total_rows"] = viewport.get("totalRows") or coverage["total_rows"]
+        count("grid_rows_read", len(viewport["rows"]))
+        if not viewport["rows"] and coverage["viewports"] == 1:
+            coverage["stop_reason"] = "no_rows"
+            break
+
+        new_rows = []
+        passed_cutoff = False
+        for identity, values in viewport["rows"]:
+            # Without a row id, identical content means the same row
+            key = identity if identity is not None else values
+            if key in seen_identities:
+                continue
+            seen_identities.add(key)
+            if identity is not None and str(identity).isdigit():
+                row_indexes.add(int(identity))
+            date_obj = parse_grid_date(values[0])
+            if date_obj is None:
+                coverage["unparsed_dates"] += 1
+            else:
+                sort_tracker.add(date_obj)
+                if cutoff_date and date_obj < cutoff_date:
+                    coverage["rows_before_cutoff"] += 1
+                    passed_cutoff = True
+            new_rows.append((values, date_obj))
+        coverage["rows_seen"] = len(seen_identities)
+
+        header_sort = viewport.get("sort")
+        if header_sort in ("ascending", "descending"):
+            coverage["sort_order"], coverage["sort_order_source"] = header_sort, "header"
+        else:
+            coverage["sort_order"], coverage["sort_order_source"] = sort_tracker.order(), "inferred"
+
+        if new_rows:
+            stalled = 0
+            yield new_rows
+        else:
+            stalled += 1
+            coverage["stalled_viewports"] += 1
+            if stalled >= MAX_STALLED_VIEWPORTS:
+                coverage["stop_reason"] = "stalled"
+                break
+
+        # Newest first by the header: everything after the first too-old row is older still
+        if passed_cutoff and coverage["sort_order_source"] == "header" and coverage["sort_order"] == "descending":
+            coverage["stop_reason"] = "cutoff"
+            break
+
+        with span("grid_scroll", viewport=coverage["viewports"]):
+            moved = scroll_one_viewport()
+            if moved:
+                wait_for_page_settled("grid_scroll") # Wait for the grid to render the next rows
+        if not moved:
+            coverage["stop_reason"] = "end_of_grid"
+            break
+
+    if row_indexes:
+        coverage["missing_row_indexes"] = (max(row_indexes) - min(row_indexes) + 1) - len(row_indexes)
+    coverage["complete"] = (
+        coverage["stop_reason"] in ("cutoff", "end_of_grid")
+        and not coverage["missing_row_indexes"]
+    )
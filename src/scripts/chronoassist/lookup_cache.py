@@ -0,0 +1,217 @@
+# Local cache of Project / Activity / WorkItem lookup values.
+#
+# The same handful of projects, activities and work items repeat across nearly
+# every entry, yet each one is typed into a searchable lookup and has to wait
+# for the search to resolve. This cache maps what an entry says (compared
+# case- and whitespace-insensitively) to the exact value the workspace uses, so
+# a field can be filled with the precise key. It is seeded from scraped history
+# and from successful submissions. When the server rejects an entry, its values
+# are dropped from the cache and the combination is remembered as rejected, so
+# the same bad combination fails before the browser is touched next time,
+# unless the user resubmits it explicitly with --retry-rejected.
+# Values expire after LOOKUP_TTL_DAYS without being seen again, and the least
+# recently seen values are evicted beyond MAX_CACHED_VALUES.
+
+import os
+import re
+import sqlite3
+import time
+
+from chronoassist.browser_session import PROFILE_BASE_DIR
+from chronoassist.tracing import count
+
+LOOKUP_CACHE_FILE = os.path.join(PROFILE_BASE_DIR, "lookup_cache.db")
+LOOKUP_FIELDS = ("Project", "Activity", "WorkItem")
+LOOKUP_TTL_DAYS = 30
+REJECTION_TTL_DAYS = 7
+MAX_CACHED_VALUES = 2000
+SOURCE_HISTORY = "history"
+SOURCE_SUBMITTED = "submitted"
+
+# Error text of a failure caused by the lookup values themselves, as opposed to
+# a date problem or a flaky page (see retry_scheduler.py). Each pattern names a
+# lookup field, so e.g. "date is not valid for the period" never blacklists a
+# combination. Matched case-insensitively.
+_LOOKUP_FIELD_PATTERN = r"(?:project|activity|work ?item)"
+LOOKUP_REJECTION_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    rf"\binvalid {_LOOKUP_FIELD_PATTERN}\b",
+    rf"\bnot a valid {_LOOKUP_FIELD_PATTERN}\b",
+    # "Project 'X' does not exist", "Work item ID X is not valid"
+    rf"\b{_LOOKUP_FIELD_PATTERN}(?: id \S+| '[^']*')? (?:does not exist|is not valid|was not found)",
+))
+
+
+def normalize_lookup_value(value):
+    """What two spellings of the same lookup value have in common: case and spacing aside."""
+    return " ".join(str(value or "").split()).casefold()
+
+
+def is_lookup_rejection(error_text):
+    return any(pattern.search(error_text or "") for pattern in LOOKUP_REJECTION_PATTERNS)
+
+
+def combination_of(entry):
+    return tuple(normalize_lookup_value(entry.get(field)) for field in LOOKUP_FIELDS)
+
+
+class LookupCache:
+    """SQLite-backed map of lookup display values to exact keys, plus rejected combinations."""
+
+    def __init__(self, path=LOOKUP_CACHE_FILE, now=None):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Scrape shards and submissions may write at the same time; same settings as the journal
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS lookup_values (
+                field TEXT NOT NULL,
+                normalized TEXT NOT NULL,
+                lookup_key TEXT NOT NULL,
+                source TEXT NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (field, normalized)
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS rejected_combinations (
+                project TEXT NOT NULL,
+                activity TEXT NOT NULL,
+                work_item TEXT NOT NULL,
+                error TEXT,
+                rejected_at REAL NOT NULL,
+                PRIMARY KEY (project, activity, work_item)
+            )
+        """)
+        self.prune(now)
+
+    def close(self):
+        self.conn.close()
+
+    def prune(self, now=None):
+        """Drops expired values and rejections, then evicts the least recently seen values over the limit."""
+        now = time.time() if now is None else now
+        with self.conn:
+            self.conn.execute("DELETE FROM lookup_values WHERE last_seen < ?", (now - LOOKUP_TTL_DAYS * 86400,))
+            self.conn.execute("DELETE FROM rejected_combinations WHERE rejected_at < ?",
+                              (now - REJECTION_TTL_DAYS * 86400,))
+            self.conn.execute("""
+                DELETE FROM lookup_values WHERE rowid NOT IN (
+                    SELECT rowid FROM lookup_values ORDER BY last_seen DESC LIMIT ?
+                )
+            """, (MAX_CACHED_VALUES,))
+
+    def record_entries(self, entries, source):
+        """Remembers the exact Project/Activity/WorkItem values of entries known to be valid."""
+        now = time.time()
+        with self.conn:
+            for entry in entries:
+                for field in LOOKUP_FIELDS:
+                    lookup_key = " ".join(str(entry.get(field) or "").split())
+                    if not lookup_key:
+                        continue
+                    self.conn.execute("""
+                        INSERT INTO lookup_values (field, normalized, lookup_key, source, last_seen)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT(field, normalized) DO UPDATE SET
+                            lookup_key = excluded.lookup_key,
+                            source = excluded.source,
+                            last_seen = excluded.last_seen
+                    """, (field, normalize_lookup_value(lookup_key), lookup_key, source, now))
+                if source == SOURCE_SUBMITTED:
+                    # The server accepted it after all, e.g. the project was opened again
+                    self.conn.execute(
+                        "DELETE FROM rejected_combinations WHERE project = ? AND activity = ? AND work_item = ?",
+                        combination_of(entry))
+
+    def resolve(self, field, value):
+        """Returns the cached exact key for a field value, or the value unchanged on a miss."""
+        normalized = normalize_lookup_value(value)
+        if not normalized:
+            return value
+        row = self.conn.execute("SELECT lookup_key FROM lookup_values WHERE field = ? AND normalized = ?",
+                                (field, normalized)).fetchone()
+        if row is None:
+            count("lookup_cache_misses")
+            return value
+        count("lookup_cache_hits")
+        with self.conn:
+            self.conn.execute("UPDATE lookup_values SET hits = hits + 1 WHERE field = ? AND normalized = ?",
+                              (field, normalized))
+        return row[0]
+
+    def resolve_entry(self, entry):
+        """Returns a copy of the entry with Project/Activity/WorkItem replaced by their cached keys."""
+        resolved = dict(entry)
+        for field in LOOKUP_FIELDS:
+            if entry.get(field):
+                resolved[field] = self.resolve(field, entry[field])
+        return resolved
+
+    def get_rejection(self, entry):
+        """Returns the server's error for this entry's combination if it was rejected recently, else None."""
+        row = self.conn.execute(
+            "SELECT error FROM rejected_combinations WHERE project = ? AND activity = ? AND work_item = ?",
+            combination_of(entry)).fetchone()
+        return row[0] if row else None
+
+    def partition(self, entries_data):
+        """
+        Splits off entries whose combination the server rejected recently.
+
+        Returns:
+            tuple: (entries_to_submit, rejected_failures), where rejected_failures are
+            failedEntries records.
+        """
+        entries_to_submit = []
+        rejected_failures = []
+        for index, entry in enumerate(entries_data):
+            rejection = self.get_rejection(entry)
+            if rejection is None:
+                entries_to_submit.append(entry)
+                continue
+            rejected_failures.append({
+                "client_id": entry.get('id', f"unknown_id_{index}"),
+                "error": (f"Not entered: this Project/Activity/WorkItem combination was rejected recently ({rejection}). "
+                          "Retry with --retry-rejected to enter it anyway."),
+            })
+        return entries_to_submit, rejected_failures
+
+    def record_outcomes(self, entries_data, submitted_client_ids, failed_entries):
+        """Learns from a submission: accepted values are cached, lookup rejections invalidated."""
+        entries_by_id = {entry.get('id'): entry for entry in entries_data}
+        submitted_ids = set(submitted_client_ids)
+        self.record_entries([entry for client_id, entry in entries_by_id.items() if client_id in submitted_ids],
+                            SOURCE_SUBMITTED)
+        for failure in failed_entries:
+            entry = entries_by_id.get(failure.get("client_id"))
+            if entry is not None and is_lookup_rejection(failure.get("error")):
+                self.invalidate(entry, failure["error"])
+
+    def invalidate(self, entry, error):
+        """
+        Handles a server rejection: drops the entry's cached values so they are
+        verified again, and remembers the combination as rejected.
+        """
+        with self.conn:
+            for field, normalized in zip(LOOKUP_FIELDS, combination_of(entry)):
+                self.conn.execute("DELETE FROM lookup_values WHERE field = ? AND normalized = ?", (field, normalized))
+            self.conn.execute("""
+                INSERT INTO rejected_combinations (project, activity, work_item, error, rejected_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(project, activity, work_item) DO UPDATE SET
+                    error = excluded.error,
+                    rejected_at = excluded.rejected_at
+            """, combination_of(entry) + (error, time.time()))
+
+
+def seed_from_history(entries, log_message):
+    """Adds scraped history to the cache. Best effort: a cache problem never fails a scrape."""
+    try:
+        lookup_cache = LookupCache()
+        try:
+            lookup_cache.record_entries(entries, SOURCE_HISTORY)
+        finally:
+            lookup_cache.close()
+    except sqlite3.Error as e_cache:
+        log_message(f"Could not update the lookup cache from history: {e_cache}")
@@ -0,0 +1,66 @@
+# Newline-delimited JSON output for the automation scripts.
+#
+# Each record is one JSON object on its own line, flushed immediately, so the
+# Node.js side can ingest results while the script is still running and keeps
+# everything emitted so far if the script times out or crashes.
+#
+# Record types written by scrape_timesheets.py --format ndjson:
+#   {"type": "entry", "entry": {...}}                       one deduplicated row
+#   {"type": "progress", "scroll": n, "entries": n, ...}    after each grid screen
+#   {"type": "heartbeat", "elapsed_secs": s}                while the script is busy
+#   {"type": "done", "entries": n, "status": "ok"|"error"}  always last
+
+import json
+import sys
+import threading
+import time
+
+HEARTBEAT_INTERVAL_SECS = 10
+
+
+class NdjsonWriter:
+    """Thread-safe writer of one JSON record per line."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.lock = threading.Lock()
+        self.started_at = time.monotonic()
+
+    def elapsed_secs(self):
+        return round(time.monotonic() - self.started_at, 1)
+
+    def emit(self, record_type, **fields):
+        record = {"type": record_type}
+        record.update(fields)
+        self.emit_record(record)
+
+    def emit_record(self, record):
+        """Writes an already-built record, e.g. one relayed from the session daemon."""
+        line = json.dumps(record)
+        with self.lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+class Heartbeat:
+    """Context manager that emits a heartbeat record every interval until it exits."""
+
+    def __init__(self, writer, interval_secs=HEARTBEAT_INTERVAL_SECS):
+        self.writer = writer
+        self.interval_secs = interval_secs
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def run(self):
+        while not self.stop_event.wait(self.interval_secs):
+            self.writer.emit("heartbeat", elapsed_secs=self.writer.elapsed_secs())
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop_event.set()
+        self.thread.join()
+        return False
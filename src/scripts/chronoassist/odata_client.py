@@ -0,0 +1,237 @@
+# HTTP backend for historical timesheet transactions.
+#
+# Reads the same Date/Project/Activity/WorkItem/Comment fields the grid scraper
+# collects, straight from the workspace's OData endpoint (/data/<entity set>),
+# in server-side filtered, paged requests. It authenticates with the cookies
+# saved by auth_state.py, so no browser is needed at all. Any failure (no saved
+# login, expired session, entity not exposed) raises ODataError and the caller
+# falls back to the Helium grid path.
+#
+# The grid shows only the logged-in user's lines in the workspace's company
+# (the cmp= of the workspace URL). The entity set holds every line the account
+# may read, so the query is scoped the same way: to the worker set in
+# CHRONOASSIST_ODATA_WORKER, and to that company. OData cannot filter on "the
+# current user", so without a configured worker the OData path is unavailable.
+#
+# The client only needs a base URL, so it can be pointed at
+# mock_timesheet_server.py, which serves a stub of the same endpoint:
+#   python -m chronoassist odata --base-url http://127.0.0.1:8770/ --no-auth --worker 000123 --company dat
+
+import argparse
+from datetime import datetime, timedelta
+import json
+import os
+import sys
+from urllib.parse import parse_qs, urlencode, urlparse, urljoin
+
+from chronoassist.browser_session import TARGET_URL, LOGIN_HOST
+
+# Entity set and field names of the timesheet transactions data entity. Check
+# them against <workspace>/data/$metadata if the tenant exposes a different one.
+ODATA_ENTITY_SET = os.environ.get("CHRONOASSIST_ODATA_ENTITY", "TimesheetTransactions")
+# TimeEntry field -> OData property
+ODATA_FIELD_MAP = {
+    "Date": "TransDate",
+    "Project": "ProjectId",
+    "Activity": "ActivityNumber",
+    "WorkItem": "CategoryId",
+    "Comment": "ExternalComment",
+}
+# Property holding the worker (resource) a line belongs to, and that worker's id
+ODATA_WORKER_PROPERTY = os.environ.get("CHRONOASSIST_ODATA_WORKER_FIELD", "ResourceId")
+ODATA_WORKER_ID = os.environ.get("CHRONOASSIST_ODATA_WORKER")
+# Legal entity of a line; matched against the workspace URL's cmp= parameter
+ODATA_COMPANY_PROPERTY = "dataAreaId"
+ODATA_PAGE_SIZE = 1000
+REQUEST_TIMEOUT_SECS = 60
+# Guards against a server that keeps returning the same nextLink
+MAX_PAGES = 1000
+
+
+class ODataError(Exception):
+    """The OData path is unavailable or failed; the caller should use the browser instead."""
+
+
+def log_message(message):
+    print(f"PYTHON_ODATA_LOG: {message}", file=sys.stderr)
+
+
+def get_workspace_base_url(target_url=TARGET_URL):
+    """Returns the scheme://host/ root of the workspace URL, where /data/ lives."""
+    parsed = urlparse(target_url)
+    return f"{parsed.scheme}://{parsed.netloc}/"
+
+
+def get_workspace_company(target_url=TARGET_URL):
+    """Returns the company (legal entity) of the workspace URL's cmp= parameter, lowercased, or None."""
+    company = parse_qs(urlparse(target_url).query).get("cmp", [""])[0].strip()
+    return company.lower() or None
+
+
+def quote_odata_string(value):
+    """Renders value as an OData string literal."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def build_cookie_header(base_url, cookies):
+    """Builds a Cookie header from saved cookies that apply to base_url's host."""
+    parsed = urlparse(base_url)
+    host = parsed.hostname or ""
+    pairs = []
+    for cookie in cookies:
+        domain = (cookie.get("domain") or "").lstrip(".")
+        if not domain or not (host == domain or host.endswith("." + domain)):
+            continue
+        if cookie.get("secure") and parsed.scheme != "https":
+            continue
+        pairs.append(f"{cookie['name']}={cookie['value']}")
+    return "; ".join(pairs)
+
+
+def format_odata_datetime(date_obj):
+    return date_obj.strftime("%Y-%m-%dT00:00:00Z")
+
+
+class TimesheetODataClient:
+    """Pages through the timesheet transactions entity set."""
+
+    def __init__(self, base_url, cookie_header="", page_size=ODATA_PAGE_SIZE,
+                 entity_set=ODATA_ENTITY_SET, timeout_secs=REQUEST_TIMEOUT_SECS,
+                 worker_id=ODATA_WORKER_ID, company=None):
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.cookie_header = cookie_header
+        self.worker_id = worker_id
+        self.company = company
+        self.page_size = page_size
+        self.entity_set = entity_set
+        self.timeout_secs = timeout_secs
+        self.requests_made = 0
+
+    def build_query_url(self, since_date, until_date=None):
+        """
+        URL of the first page: this worker's rows in this company with
+        since_date <= date (< until_date), newest first.
+
+        Raises:
+            ODataError: If no worker id is configured.
+        """
+        if not self.worker_id:
+            raise ODataError("No worker id configured (set CHRONOASSIST_ODATA_WORKER); "
+                             "the query would return other users' lines.")
+        date_property = ODATA_FIELD_MAP["Date"]
+        filters = [f"{ODATA_WORKER_PROPERTY} eq {quote_odata_string(self.worker_id)}",
+                   f"{date_property} ge {format_odata_datetime(since_date)}"]
+        if until_date:
+            filters.append(f"{date_property} lt {format_odata_datetime(until_date)}")
+        query = {
+            "$select": ",".join(ODATA_FIELD_MAP.values()),
+            "$orderby": f"{date_property} desc",
+        }
+        if self.company:
+            filters.append(f"{ODATA_COMPANY_PROPERTY} eq {quote_odata_string(self.company)}")
+            # The dataAreaId filter only reaches past the account's default company with this
+            query["cross-company"] = "true"
+        query["$filter"] = " and ".join(filters)
+        return urljoin(self.base_url, f"data/{self.entity_set}") + "?" + urlencode(query)
+
+    def get_json(self, url):
+        """GETs one page. Raises ODataError for anything but a JSON OData response."""
+        # Imported here: urllib.request costs more to import than everything else the scraper needs up front
+        from urllib.error import HTTPError, URLError
+        from urllib.request import Request, urlopen
+
+        request = Request(url, headers={
+            "Accept": "application/json",
+            "OData-Version": "4.0",
+            "Prefer": f"odata.maxpagesize={self.page_size}",
+            "Cookie": self.cookie_header,
+        })
+        self.requests_made += 1
+        try:
+            with urlopen(request, timeout=self.timeout_secs) as response:
+                # An expired session is redirected to the Azure AD sign-in page
+                if LOGIN_HOST in (urlparse(response.geturl()).hostname or ""):
+                    raise ODataError("Session expired (redirected to the Azure AD login page).")
+                content_type = response.headers.get("Content-Type", "")
+                if "json" not in content_type:
+                    raise ODataError(f"Expected JSON from {url}, got '{content_type}'.")
+                return json.loads(response.read().decode("utf-8"))
+        except HTTPError as e_http:
+            if e_http.code in (401, 403):
+                raise ODataError(f"Not authorized for OData ({e_http.code}); the saved login may have expired.") from None
+            if e_http.code == 404:
+                raise ODataError(f"Entity set '{self.entity_set}' is not exposed by this workspace.") from None
+            raise ODataError(f"OData request failed with HTTP {e_http.code}.") from None
+        except (URLError, OSError, ValueError) as e_request:
+            raise ODataError(f"OData request failed: {e_request}") from None
+
+    def iter_rows(self, since_date, until_date=None):
+        """Yields raw OData rows, following @odata.nextLink until the last page."""
+        url = self.build_query_url(since_date, until_date)
+        for _ in range(MAX_PAGES):
+            page = self.get_json(url)
+            for row in page.get("value", []):
+                yield row
+            next_link = page.get("@odata.nextLink")
+            if not next_link:
+                return
+            url = urljoin(self.base_url, next_link)
+        raise ODataError(f"Gave up after {MAX_PAGES} pages.")
+
+    def fetch_entries(self, since_date, until_date=None):
+        """Returns the entries in [since_date, until_date) in the scraper's entry shape, newest first."""
+        entries = []
+        for row in self.iter_rows(since_date, until_date):
+            entry = {field: str(row.get(odata_property) or "") for field, odata_property in ODATA_FIELD_MAP.items()}
+            entry["Date"] = entry["Date"][:10] # "2025-05-13T12:00:00Z" -> "2025-05-13"
+            entry["Hours"] = "" # Same as the grid scraper; not needed for the AI context
+            entries.append({key: entry[key] for key in ("Date", "Project", "Activity", "WorkItem", "Hours", "Comment")})
+        return entries
+
+
+def create_client_from_saved_login(base_url=None):
+    """
+    Returns a client authenticated with the cookies saved by auth_state.py.
+
+    Raises:
+        ODataError: If there is no usable saved login.
+    """
+    from chronoassist.auth_state import load_auth_state
+
+    base_url = base_url or get_workspace_base_url()
+    auth_state = load_auth_state()
+    if not auth_state:
+        raise ODataError("No saved login available for OData requests.")
+    cookie_header = build_cookie_header(base_url, auth_state["cookies"])
+    if not cookie_header:
+        raise ODataError(f"The saved login has no cookies for {base_url}.")
+    if not ODATA_WORKER_ID:
+        raise ODataError("No worker id configured (set CHRONOASSIST_ODATA_WORKER).")
+    return TimesheetODataClient(base_url, cookie_header=cookie_header, company=get_workspace_company())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch timesheet transactions over OData and print them as JSON.")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--base-url", help="Workspace root (default: from CHRONOASSIST_TARGET_URL).")
+    parser.add_argument("--no-auth", action="store_true", help="Send no cookies, e.g. against the mock server.")
+    parser.add_argument("--worker", default=ODATA_WORKER_ID,
+                        help="Worker (resource) id whose lines to fetch (default: CHRONOASSIST_ODATA_WORKER).")
+    parser.add_argument("--company", default=get_workspace_company(),
+                        help="Company (dataAreaId) to fetch from (default: cmp= of the workspace URL).")
+    args = parser.parse_args()
+
+    try:
+        if args.no_auth:
+            client = TimesheetODataClient(args.base_url or get_workspace_base_url())
+        else:
+            client = create_client_from_saved_login(args.base_url)
+        client.worker_id = args.worker
+        client.company = args.company.lower() if args.company else None
+        since = datetime.now() - timedelta(days=args.days)
+        entries = client.fetch_entries(since)
+    except ODataError as e_odata:
+        log_message(str(e_odata))
+        sys.exit(1)
+    log_message(f"Fetched {len(entries)} entries in {client.requests_made} requests.")
+    print(json.dumps(entries))
@@ -0,0 +1,227 @@
+# Runs scrape or submit work across several Chrome instances in parallel.
+#
+# Each worker is a separate process with its own Helium browser and its own
+# copy of the persistent Azure AD profile (Chrome refuses to share one user
+# data dir between running instances). Work is sharded so workers never touch
+# the same data: scraping is split into date windows, submission into whole
+# timesheet weeks. Results are merged into the same JSON shapes the single
+# scripts print, so callers don't need to know how many workers ran.
+#
+# Usage:
+#   python -m chronoassist parallel scrape --days 90 --workers 3
+#   python -m chronoassist parallel submit --entries-file entries.json --workers 2 [--mode batch]
+# Add --target-url http://127.0.0.1:8770/ to run against mock_timesheet_server.py.
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+
+from chronoassist.browser_session import get_profile_path, PROFILE_DIR_NAME
+from chronoassist.dates import parse_entry_date
+from chronoassist import tracing
+
+DEFAULT_WORKERS = 2
+# Hard cap on concurrent browsers so the tenant doesn't start throttling the account
+MAX_WORKERS = 4
+# Delay between worker start-ups so the logins don't all hit Azure AD at once
+WORKER_START_STAGGER_SECS = 3
+# Profile content that is per-instance or safely rebuilt; never copied to worker clones
+PROFILE_CLONE_IGNORE = shutil.ignore_patterns(
+    "Singleton*", "lockfile", "*.lock", "Cache", "Code Cache", "GPUCache", "Crashpad", "ShaderCache",
+)
+
+
+def log_message(message):
+    print(f"PYTHON_PARALLEL_LOG: {message}", file=sys.stderr)
+
+
+def clone_profile(worker_index, source_profile=PROFILE_DIR_NAME, refresh=False):
+    """
+    Returns the path of worker_index's private copy of the source profile,
+    creating it (or re-copying it when refresh is set) from the logged-in profile.
+    """
+    source_path = get_profile_path(source_profile)
+    clone_path = get_profile_path(f"{source_profile}_worker{worker_index}")
+    if refresh and os.path.isdir(clone_path):
+        shutil.rmtree(clone_path)
+    if not os.path.isdir(clone_path):
+        if os.path.isdir(source_path):
+            log_message(f"Cloning profile {source_path} -> {clone_path}")
+            shutil.copytree(source_path, clone_path, ignore=PROFILE_CLONE_IGNORE)
+        else:
+            os.makedirs(clone_path, exist_ok=True) # Worker will need an interactive login
+    return clone_path
+
+
+def shard_date_windows(days_ago, worker_count):
+    """Splits [days_ago, 0) into worker_count contiguous (days_ago, until_days_ago) windows, newest first."""
+    worker_count = max(1, min(worker_count, days_ago))
+    bounds = [round(days_ago * i / worker_count) for i in range(worker_count + 1)]
+    return [(bounds[i + 1], bounds[i]) for i in range(worker_count)]
+
+
+def shard_entries_by_week(entries_data, worker_count):
+    """
+    Splits entries into at most worker_count shards without ever splitting a
+    timesheet week, so two browsers never edit the same timesheet. Weeks are
+    assigned largest first to the least-loaded shard.
+    """
+    weeks = {}
+    for entry in entries_data:
+        try:
+            iso_year, iso_week, _ = parse_entry_date(entry.get('Date')).isocalendar()
+            week_key = (iso_year, iso_week)
+        except ValueError:
+            week_key = ("invalid",) # Fails validation in whichever worker gets it
+        weeks.setdefault(week_key, []).append(entry)
+    shards = [[] for _ in range(max(1, min(worker_count, len(weeks))))]
+    for week_entries in sorted(weeks.values(), key=len, reverse=True):
+        min(shards, key=len).extend(week_entries)
+    return [shard for shard in shards if shard]
+
+
+def run_shard(shard):
+    """Worker process body: one browser on one profile clone, one shard of work."""
+    from chronoassist.browser_session import start_workspace_session, close_session
+
+    time.sleep(shard["index"] * WORKER_START_STAGGER_SECS) # Don't start every Chrome at once
+    tracing.start_run(f"parallel_runner.{shard['op']}.worker{shard['index']}")
+    started = time.monotonic()
+    try:
+        start_workspace_session(log_message, profile_path=shard["profile_path"])
+        if shard["op"] == "scrape":
+            from chronoassist.scrape_timesheets import collect_timesheet_entries
+            result = collect_timesheet_entries(
+                days_ago=shard["days_ago"], until_days_ago=shard["until_days_ago"],
+                extraction_mode=shard.get("extraction_mode", "js"), full_refresh=True)
+        else:
+            from chronoassist.submit_timesheets import submit_entries_in_session
+            result = submit_entries_in_session(shard["entries"], mode=shard.get("mode", "single"),
+                                               retry_in_doubt=shard.get("retry_in_doubt", False),
+                                               retry_rejected=shard.get("retry_rejected", False))
+        outcome = {"index": shard["index"], "ok": True, "result": result}
+    except Exception as e_shard:
+        outcome = {"index": shard["index"], "ok": False, "error": str(e_shard)}
+    finally:
+        close_session(log_message)
+    outcome["elapsed_secs"] = round(time.monotonic() - started, 1)
+    outcome["trace"] = tracing.finish_run()
+    return outcome
+
+
+def run_shards(shards):
+    """Runs shards on a process pool sized to the shard count. Returns outcomes ordered by shard index."""
+    outcomes = []
+    # "spawn" gives every worker a clean interpreter (and its own Helium globals) on every OS
+    with ProcessPoolExecutor(max_workers=len(shards), mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(run_shard, shard) for shard in shards]
+        for future in as_completed(futures):
+            outcome = future.result()
+            tracing.merge_summary(outcome["trace"]) # Worker phases add up; wall_secs stays the parent's
+            status = "finished" if outcome["ok"] else f"failed ({outcome['error']})"
+            log_message(f"Shard {outcome['index']} {status} in {outcome['elapsed_secs']}s.")
+            outcomes.append(outcome)
+    return sorted(outcomes, key=lambda outcome: outcome["index"])
+
+
+def parallel_scrape(days_ago, workers=DEFAULT_WORKERS, extraction_mode="js", refresh_profiles=False):
+    """Scrapes days_ago days of history in date windows. Returns the merged entry list."""
+    from chronoassist.scrape_checkpoint import entry_key
+
+    windows = shard_date_windows(days_ago, min(workers, MAX_WORKERS))
+    shards = [{
+        "index": i, "op": "scrape",
+        "days_ago": window_days_ago, "until_days_ago": until_days_ago,
+        "extraction_mode": extraction_mode,
+        "profile_path": clone_profile(i, refresh=refresh_profiles),
+    } for i, (window_days_ago, until_days_ago) in enumerate(windows)]
+    log_message(f"Scraping {days_ago} days with {len(shards)} workers: {windows}")
+
+    entries = []
+    seen_keys = set()
+    for outcome in run_shards(shards):
+        for entry in outcome.get("result") or []:
+            key = entry_key(entry)
+            if key not in seen_keys: # Windows don't overlap, but be safe at the edges
+                seen_keys.add(key)
+                entries.append(entry)
+    entries.sort(key=lambda entry: entry["Date"], reverse=True)
+    return entries
+
+
+def parallel_submit(entries_data, workers=DEFAULT_WORKERS, mode="single", refresh_profiles=False, retry_in_doubt=False,
+                    retry_rejected=False):
+    """Submits entries in week shards. Returns one merged result in the submit_timesheets.py contract."""
+    from chronoassist.submit_timesheets import build_critical_failure_result
+
+    entry_shards = shard_entries_by_week(entries_data, min(workers, MAX_WORKERS))
+    shards = [{
+        "index": i, "op": "submit", "entries": shard_entries, "mode": mode,
+        "retry_in_doubt": retry_in_doubt, "retry_rejected": retry_rejected,
+        "profile_path": clone_profile(i, refresh=refresh_profiles),
+    } for i, shard_entries in enumerate(entry_shards)]
+    log_message(f"Submitting {len(entries_data)} entries with {len(shards)} workers.")
+
+    submitted_entry_client_ids = []
+    failed_entries_details = []
+    for shard, outcome in zip(shards, run_shards(shards)):
+        result = outcome["result"] if outcome["ok"] else build_critical_failure_result(shard["entries"], outcome["error"])
+        submitted_entry_client_ids.extend(result.get("submittedEntryClientIds", []))
+        failed_entries_details.extend(result.get("failedEntries", []))
+
+    all_successful = not failed_entries_details
+    if all_successful:
+        final_message = f"All {len(entries_data)} entries submitted successfully."
+    elif not submitted_entry_client_ids:
+        final_message = f"All {len(failed_entries_details)} entries failed to submit."
+    else:
+        final_message = f"Submission complete. {len(submitted_entry_client_ids)} entries submitted, {len(failed_entries_details)} entries failed."
+    return {
+        "overallSuccess": all_successful,
+        "message": final_message,
+        "submittedEntryClientIds": submitted_entry_client_ids,
+        "failedEntries": failed_entries_details,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run scrape/submit work across parallel browser workers.")
+    parser.add_argument("op", choices=("scrape", "submit"))
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"Concurrent browsers (max {MAX_WORKERS}).")
+    parser.add_argument("--days", type=int, default=30, help="scrape: days of history to retrieve.")
+    parser.add_argument("--extraction", choices=("js", "helium"), default="js", help="scrape: grid reading strategy.")
+    parser.add_argument("--entries-file", help="submit: TimeEntry JSON array or NDJSON file ('-' for stdin).")
+    parser.add_argument("--mode", choices=("single", "batch"), default="single", help="submit: entry mode.")
+    parser.add_argument("--retry-in-doubt", action="store_true", help="submit: re-enter entries left in doubt by a crash.")
+    parser.add_argument("--retry-rejected", action="store_true",
+                        help="submit: enter entries whose lookup values were rejected recently.")
+    parser.add_argument("--refresh-profiles", action="store_true", help="Re-copy worker profiles from the main profile.")
+    parser.add_argument("--target-url", help="Workspace URL override, e.g. a local mock server.")
+    args = parser.parse_args()
+
+    if args.target_url:
+        # Read by browser_session in every worker process
+        os.environ["CHRONOASSIST_TARGET_URL"] = args.target_url
+
+    tracing.start_run(f"parallel_runner.{args.op}")
+    if args.op == "scrape":
+        output = parallel_scrape(args.days, workers=args.workers, extraction_mode=args.extraction,
+                                 refresh_profiles=args.refresh_profiles)
+    else:
+        if not args.entries_file:
+            parser.error("submit needs --entries-file")
+        from chronoassist.entry_input import read_entries
+        from chronoassist.submit_timesheets import merge_invalid_entries
+        entries_data, invalid_entries = read_entries(args.entries_file)
+        output = merge_invalid_entries(
+            parallel_submit(entries_data, workers=args.workers, mode=args.mode,
+                            refresh_profiles=args.refresh_profiles, retry_in_doubt=args.retry_in_doubt,
+                            retry_rejected=args.retry_rejected),
+            invalid_entries)
+    print(json.dumps(output))
+    tracing.finish_run(workers=args.workers)
@@ -0,0 +1,160 @@
+# Event-driven readiness detection for the Dynamics pages driven by the
+# automation scripts. Instead of fixed time.sleep() calls, each step waits on a
+# real condition (spinner gone, DOM quiet, grid row count settled) with its own
+# timeout, and every wait records how long it actually took.
+
+import sys
+import time
+
+from chronoassist.browser_session import get_driver
+from chronoassist.tracing import record_span
+
+# Per-step upper bounds. A wait that hits its bound logs a warning and lets the
+# caller carry on, which is what the old fixed sleeps did on a slow day.
+STEP_TIMEOUTS = {
+    "grid_load": 30,
+    "grid_scroll": 10,
+    "registration_form": 20,
+    "new_line": 10,
+}
+POLL_INTERVAL_SECS = 0.1
+# How long the DOM must be free of mutations before the page counts as settled.
+DOM_QUIET_MS = 400
+# Number of consecutive polls with the same grid row count before it counts as settled.
+ROW_COUNT_STABLE_POLLS = 3
+
+# Dynamics 365 busy indicators; any visible match means the page is still working.
+SPINNER_SELECTORS = [
+    "#ShellBlockingDiv",
+    ".appBusyIndicator",
+    ".busyIndicator",
+    "[role='progressbar']",
+]
+
+# Installs (once per document) a MutationObserver recording the time of the
+# last DOM change, and returns how many ms the DOM has been quiet since.
+DOM_QUIET_SCRIPT = """
+if (!window.__chronoAssistMutations) {
+    window.__chronoAssistMutations = {last: performance.now()};
+    new MutationObserver(function () {
+        window.__chronoAssistMutations.last = performance.now();
+    }).observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+    return 0;
+}
+return performance.now() - window.__chronoAssistMutations.last;
+"""
+
+SPINNER_VISIBLE_SCRIPT = """
+var selectors = arguments[0];
+for (var i = 0; i < selectors.length; i++) {
+    var matches = document.querySelectorAll(selectors[i]);
+    for (var j = 0; j < matches.length; j++) {
+        if (matches[j].getClientRects().length > 0) { return true; }
+    }
+}
+return false;
+"""
+
+ROW_COUNT_SCRIPT = "return document.querySelectorAll(arguments[0]).length;"
+
+# (step, seconds waited, condition met) for every wait in this process
+wait_timings = []
+
+
+def log_message(message):
+    print(f"PYTHON_READINESS_LOG: {message}", file=sys.stderr)
+
+
+def record_wait(step, elapsed_secs, satisfied):
+    wait_timings.append((step, elapsed_secs, satisfied))
+    record_span(f"wait.{step}", elapsed_secs, ok=satisfied)
+    outcome = "ready" if satisfied else "timed out"
+    log_message(f"Wait '{step}' {outcome} after {elapsed_secs:.2f}s.")
+
+
+def reset_wait_timings():
+    """Starts a fresh timing record, e.g. at the start of each session daemon job."""
+    del wait_timings[:]
+
+
+def summarize_waits():
+    """Returns {step: {"count", "total_secs", "max_secs", "timeouts"}} for the waits so far."""
+    summary = {}
+    for step, elapsed_secs, satisfied in wait_timings:
+        stats = summary.setdefault(step, {"count": 0, "total_secs": 0.0, "max_secs": 0.0, "timeouts": 0})
+        stats["count"] += 1
+        stats["total_secs"] = round(stats["total_secs"] + elapsed_secs, 3)
+        stats["max_secs"] = round(max(stats["max_secs"], elapsed_secs), 3)
+        if not satisfied:
+            stats["timeouts"] += 1
+    return summary
+
+
+def wait_for(condition, step, timeout_secs=None, poll_secs=POLL_INTERVAL_SECS):
+    """
+    Polls condition() until it returns a truthy value or the step times out.
+    Exceptions from condition() (e.g. stale elements mid-render) count as "not yet".
+
+    Returns:
+        bool: True if the condition was met, False on timeout.
+    """
+    timeout_secs = STEP_TIMEOUTS.get(step, 10) if timeout_secs is None else timeout_secs
+    started = time.monotonic()
+    deadline = started + timeout_secs
+    satisfied = False
+    while True:
+        try:
+            satisfied = bool(condition())
+        except Exception:
+            satisfied = False
+        if satisfied or time.monotonic() >= deadline:
+            break
+        time.sleep(poll_secs)
+    record_wait(step, time.monotonic() - started, satisfied)
+    return satisfied
+
+
+def is_spinner_visible():
+    return bool(get_driver().execute_script(SPINNER_VISIBLE_SCRIPT, SPINNER_SELECTORS))
+
+
+def get_dom_quiet_ms():
+    return get_driver().execute_script(DOM_QUIET_SCRIPT) or 0
+
+
+def count_rows(row_selector):
+    return get_driver().execute_script(ROW_COUNT_SCRIPT, row_selector) or 0
+
+
+def wait_for_page_settled(step, timeout_secs=None, quiet_ms=DOM_QUIET_MS):
+    """Waits until no busy indicator is visible and the DOM has stopped changing."""
+    get_dom_quiet_ms() # Install the observer before the first real check
+    return wait_for(
+        lambda: not is_spinner_visible() and get_dom_quiet_ms() >= quiet_ms,
+        step,
+        timeout_secs=timeout_secs,
+    )
+
+
+def wait_for_rows_settled(row_selector, step, timeout_secs=None, min_rows=1,
+                          stable_polls=ROW_COUNT_STABLE_POLLS, quiet_ms=DOM_QUIET_MS):
+    """
+    Waits until the grid shows at least min_rows rows, the row count has been the
+    same for stable_polls consecutive polls, no spinner is visible and the DOM is quiet.
+    """
+    state = {"last_count": -1, "stable_for": 0}
+    get_dom_quiet_ms()
+
+    def rows_settled():
+        row_count = count_rows(row_selector)
+        if row_count == state["last_count"]:
+            state["stable_for"] += 1
+        else:
+            state["last_count"] = row_count
+            state["stable_for"] = 0
+        return (row_count >= min_rows
+                and state["stable_for"] >= stable_polls
+                and not is_spinner_visible()
+                and get_dom_quiet_ms() >= quiet_ms)
+
+    return wait_for(rows_settled, step, timeout_secs=timeout_secs)
@@ -0,0 +1,196 @@
+# In-session retries for entries that failed to submit.
+#
+# A failed entry used to end up in failedEntries straight away, so a slow
+# WorkItem lookup or a stale element meant a whole new run (browser start,
+# login wait) just to enter it again. Here each failure is classified as
+# transient (worth another try in the same session) or permanent (bad input,
+# rejected value). Transient failures are requeued with exponential backoff and
+# jitter, and the backoff grows with the page latency observed so far, so a
+# struggling tenant is given more room instead of being hammered. Unknown
+# errors count as permanent: retrying a line that may already have been saved
+# could enter it twice.
+
+import heapq
+import os
+import random
+import sys
+import time
+
+from chronoassist.tracing import span, count
+
+MAX_ATTEMPTS = int(os.environ.get("CHRONOASSIST_SUBMIT_MAX_ATTEMPTS", "3"))
+BASE_DELAY_SECS = 2.0
+MAX_DELAY_SECS = 60.0
+# Smoothing of the per-entry latency average (weight of the newest observation)
+LATENCY_SMOOTHING = 0.3
+# Backoff is scaled by how much slower the page is than its best, up to this factor
+MAX_LATENCY_FACTOR = 4.0
+
+# Matched case-insensitively against the failure's error text. Permanent
+# patterns win when both match, e.g. "Invalid date format" is never retried.
+PERMANENT_ERROR_PATTERNS = (
+    "invalid date",
+    "date is missing",
+    "missing fields",
+    "invalid workitem",
+    "not valid",
+    "does not exist",
+)
+TRANSIENT_ERROR_PATTERNS = (
+    "timed out",
+    "timeout",
+    "stale element",
+    "staleelementreference",
+    "click intercepted",
+    "not interactable",
+    "could not find the 'hours' button",
+    "throttl",
+    "too many requests",
+    "http 429",
+    "http 503",
+    "service unavailable",
+    "temporarily unavailable",
+    "try again",
+)
+
+
+def log_message(message):
+    print(f"PYTHON_SUBMIT_LOG: {message}", file=sys.stderr)
+
+
+def classify_error(error_text):
+    """Returns "transient" or "permanent" for a failure's error text."""
+    error_text = (error_text or "").lower()
+    if any(pattern in error_text for pattern in PERMANENT_ERROR_PATTERNS):
+        return "permanent"
+    if any(pattern in error_text for pattern in TRANSIENT_ERROR_PATTERNS):
+        return "transient"
+    return "permanent"
+
+
+class RetryScheduler:
+    """Queue of failed entries waiting for another attempt, ordered by when they are due."""
+
+    def __init__(self, max_attempts=MAX_ATTEMPTS, base_delay_secs=BASE_DELAY_SECS,
+                 max_delay_secs=MAX_DELAY_SECS, rng=None, clock=time.monotonic):
+        self.max_attempts = max_attempts
+        self.base_delay_secs = base_delay_secs
+        self.max_delay_secs = max_delay_secs
+        self.rng = rng or random.Random()
+        self.clock = clock
+        self.attempts = {} # client_id -> attempts made so far
+        self.queue = [] # (due time, sequence, entry)
+        self.sequence = 0
+        self.latency_secs = None # Smoothed seconds per entry
+        self.best_latency_secs = None
+
+    def __len__(self):
+        return len(self.queue)
+
+    def observe_latency(self, secs_per_entry):
+        """Feeds in how long an entry took, so backoff follows the page's pace."""
+        if self.latency_secs is None:
+            self.latency_secs = secs_per_entry
+        else:
+            self.latency_secs += LATENCY_SMOOTHING * (secs_per_entry - self.latency_secs)
+        if self.best_latency_secs is None or self.latency_secs < self.best_latency_secs:
+            self.best_latency_secs = self.latency_secs
+
+    def latency_factor(self):
+        """How many times slower the page currently is than its best, between 1 and MAX_LATENCY_FACTOR."""
+        if not self.latency_secs or not self.best_latency_secs:
+            return 1.0
+        return min(MAX_LATENCY_FACTOR, max(1.0, self.latency_secs / self.best_latency_secs))
+
+    def backoff_secs(self, attempt):
+        """Delay before retry number `attempt` (1 = first retry): exponential, scaled by latency, with jitter."""
+        delay = min(self.max_delay_secs, self.base_delay_secs * 2 ** (attempt - 1)) * self.latency_factor()
+        # "Equal jitter": at least half the delay, so retries never bunch up at zero
+        return self.rng.uniform(delay / 2, delay)
+
+    def schedule(self, entry, failure):
+        """
+        Requeues a failed entry if its error is transient and it has attempts left.
+
+        Returns:
+            bool: True if the entry will be retried; False if the failure is final.
+        """
+        client_id = entry.get('id')
+        attempts = self.attempts.get(client_id, 0) + 1
+        self.attempts[client_id] = attempts
+        if classify_error(failure.get("error")) != "transient" or attempts >= self.max_attempts:
+            return False
+        due = self.clock() + self.backoff_secs(attempts)
+        heapq.heappush(self.queue, (due, self.sequence, entry))
+        self.sequence += 1
+        return True
+
+    def pop_due(self):
+        """
+        Takes the next entry to retry plus every entry due within base_delay_secs
+        of it, so a round of retries shares one wait (and, in batch mode, one
+        script call) instead of jitter spreading them over many rounds.
+
+        Returns:
+            tuple: (entries, seconds to wait before retrying them)
+        """
+        first_due, _, entry = heapq.heappop(self.queue)
+        entries, last_due = [entry], first_due
+        while self.queue and self.queue[0][0] <= first_due + self.base_delay_secs:
+            last_due, _, entry = heapq.heappop(self.queue)
+            entries.append(entry)
+        # Wait for the last of them, so none is retried before its own backoff is over
+        return entries, max(0.0, last_due - self.clock())
+
+
+def submit_with_retries(entries_data, submit_pass, scheduler=None, sleep=time.sleep):
+    """
+    Runs submit_pass over the entries, then retries transient failures in the
+    same session until they succeed, fail permanently or run out of attempts.
+
+    Args:
+        entries_data (list): TimeEntry dictionaries; 'id' is the client_id.
+        submit_pass (callable): Takes a list of entries and returns
+            (submitted_client_ids, failed_entries), e.g. submit_entries_one_by_one.
+        scheduler (RetryScheduler): Defaults to a new one with the module settings.
+        sleep (callable): Used to wait out the backoff.
+
+    Returns:
+        tuple: (submitted_client_ids, failed_entries) in the result contract's shapes.
+    """
+    if scheduler is None:
+        scheduler = RetryScheduler()
+    entries_by_id = {entry.get('id'): entry for entry in entries_data}
+    final_failures = []
+
+    def run_pass(entries):
+        started = time.monotonic()
+        pass_submitted, pass_failed = submit_pass(entries)
+        scheduler.observe_latency((time.monotonic() - started) / max(1, len(entries)))
+        return pass_submitted, pass_failed
+
+    def triage(failures):
+        for failure in failures:
+            entry = entries_by_id.get(failure.get("client_id"))
+            if entry is not None and scheduler.schedule(entry, failure):
+                continue
+            attempts = scheduler.attempts.get(failure.get("client_id"), 1)
+            if attempts > 1:
+                failure = dict(failure, error=f"{failure['error']} (gave up after {attempts} attempts)")
+            final_failures.append(failure)
+
+    submitted_entry_client_ids, failed_entries_details = run_pass(entries_data)
+    triage(failed_entries_details)
+    retry_round = 0
+    while scheduler:
+        retry_round += 1
+        due_entries, wait_secs = scheduler.pop_due()
+        log_message(f"Retrying {len(due_entries)} entries with transient failures in {wait_secs:.1f}s "
+                    f"(round {retry_round}, page latency x{scheduler.latency_factor():.1f}).")
+        count("submit_retries", len(due_entries))
+        sleep(wait_secs)
+        with span("submit_retry", round=retry_round, entries=len(due_entries)):
+            retry_submitted, retry_failed = run_pass(due_entries)
+        submitted_entry_client_ids.extend(retry_submitted)
+        triage(retry_failed)
+    return submitted_entry_client_ids, final_failures
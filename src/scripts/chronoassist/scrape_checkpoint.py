@@ -0,0 +1,93 @@
+# Persisted high-water mark for incremental scrapes.
+#
+# After a scrape that reached its cutoff, the newest date seen and the oldest
+# date fully covered are written next to the browser profile. The next scrape
+# only scrolls back to the high-water mark (minus a small overlap for entries
+# that were back-dated after the last run) instead of re-reading the whole
+# history window. Rows older than that are already in user_historical_entries.
+#
+# That table is per user, so the checkpoint is too: the app passes its user id
+# as the checkpoint key, and a user whose stored history is empty (new cookie,
+# reset database) scrapes with --full instead of trusting anyone's mark.
+
+from datetime import datetime, timedelta
+import hashlib
+import json
+import os
+
+from chronoassist.browser_session import PROFILE_BASE_DIR
+
+CHECKPOINT_FILE = os.path.join(PROFILE_BASE_DIR, "scrape_checkpoint.json")
+# Re-read this many days before the high-water mark to catch back-dated entries.
+CHECKPOINT_OVERLAP_DAYS = 7
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def checkpoint_path(checkpoint_key=None):
+    """Checkpoint file for a caller-chosen key (e.g. the app's user id); the shared file when there is none."""
+    if not checkpoint_key:
+        return CHECKPOINT_FILE
+    # Hashed: the key comes from a cookie and must not become a path
+    key_digest = hashlib.sha256(str(checkpoint_key).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(PROFILE_BASE_DIR, f"scrape_checkpoint.{key_digest}.json")
+
+
+def entry_key(entry):
+    """Identity of a scraped row; the same columns the old linear duplicate check compared."""
+    return (entry["Date"], entry["Project"], entry["Activity"], entry["WorkItem"])
+
+
+def load_checkpoint(path=CHECKPOINT_FILE):
+    """Returns {"high_water_mark", "covered_from", "updated_at"} or None when there is no usable checkpoint."""
+    try:
+        with open(path, "r", encoding="utf-8") as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        datetime.strptime(checkpoint["high_water_mark"], DATE_FORMAT)
+        datetime.strptime(checkpoint["covered_from"], DATE_FORMAT)
+        return checkpoint
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def get_scrape_cutoff(target_date, checkpoint):
+    """
+    Returns the date the scroll can stop at. Uses the checkpoint only if it
+    already covers the requested window; otherwise the full window is scraped.
+    """
+    if not checkpoint:
+        return target_date
+    covered_from = datetime.strptime(checkpoint["covered_from"], DATE_FORMAT)
+    if covered_from > target_date:
+        return target_date # History window grew since the last scrape
+    high_water_mark = datetime.strptime(checkpoint["high_water_mark"], DATE_FORMAT)
+    return max(target_date, high_water_mark - timedelta(days=CHECKPOINT_OVERLAP_DAYS))
+
+
+def save_checkpoint(target_date, newest_date, previous_checkpoint, used_checkpoint, path=CHECKPOINT_FILE):
+    """
+    Records a scrape that reached its cutoff.
+
+    Args:
+        target_date (datetime): Oldest date requested by this run.
+        newest_date (datetime | None): Newest row date seen by this run.
+        previous_checkpoint (dict | None): Checkpoint loaded at the start of the run.
+        used_checkpoint (bool): Whether this run stopped early at the previous high-water mark.
+    """
+    covered_from = target_date
+    high_water_mark = newest_date
+    if used_checkpoint and previous_checkpoint:
+        covered_from = min(covered_from, datetime.strptime(previous_checkpoint["covered_from"], DATE_FORMAT))
+        previous_mark = datetime.strptime(previous_checkpoint["high_water_mark"], DATE_FORMAT)
+        high_water_mark = max(high_water_mark, previous_mark) if high_water_mark else previous_mark
+    if high_water_mark is None:
+        return # Nothing scraped and nothing known; leave no checkpoint behind
+    checkpoint = {
+        "high_water_mark": high_water_mark.strftime(DATE_FORMAT),
+        "covered_from": covered_from.strftime(DATE_FORMAT),
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as checkpoint_file:
+        json.dump(checkpoint, checkpoint_file)
+    os.replace(temp_path, path) # Atomic, so a crash never leaves a half-written checkpoint
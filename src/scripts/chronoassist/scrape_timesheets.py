@@ -0,0 +1,392 @@
+
+# Conceptual Python script using Helium for web scraping
+# To run this, you'll need to install Helium: pip install helium
+# And a compatible web driver (e.g., ChromeDriver for Chrome)
+#
+# Helium is imported only inside the functions that drive the browser, so
+# --help, the OData backend and importing this module stay fast.
+
+import argparse
+from contextlib import nullcontext
+import json
+from datetime import datetime, timedelta
+import sys
+
+from chronoassist.browser_session import start_workspace_session, close_session, get_driver, is_headless_session
+from chronoassist.dates import parse_entry_date
+from chronoassist.readiness import wait_for_rows_settled, summarize_waits, reset_wait_timings
+from chronoassist.grid_extract import EXTRACTION_MODES
+from chronoassist.grid_scroller import iter_grid_viewports, new_coverage
+from chronoassist.lookup_cache import seed_from_history
+from chronoassist.scrape_checkpoint import entry_key, checkpoint_path, load_checkpoint, get_scrape_cutoff, save_checkpoint
+from chronoassist.ndjson_stream import NdjsonWriter, Heartbeat
+from chronoassist.daemon_client import run_via_daemon
+from chronoassist.odata_client import create_client_from_saved_login, ODataError
+from chronoassist import tracing
+from chronoassist.tracing import span
+
+# One Date input per rendered grid row
+GRID_ROW_SELECTOR = "input[aria-label='Date']"
+# "auto" tries the OData endpoint with the saved login first and falls back to the grid
+SCRAPE_BACKENDS = ("auto", "odata", "browser")
+
+# Add a log function to help debug issues when running from Node.js
+def log_message(message):
+    # In a real scenario, you might want to write to a dedicated log file
+    # For now, print to stderr so Node.js can capture it if needed
+    print(f"PYTHON_SCRIPT_LOG: {message}", file=sys.stderr)
+
+def get_date_days_ago(days=90):
+    """Helper to get the date a specified number of days ago for filtering.
+    
+    Args:
+        days (int): Number of days to go back from today
+        
+    Returns:
+        datetime: Date object representing days_ago days in the past
+    """
+    return datetime.now() - timedelta(days=days)
+
+def collect_timesheet_entries(days_ago=30, extraction_mode="js", full_refresh=False,
+                              on_entry=None, on_progress=None, until_days_ago=None, on_coverage=None,
+                              checkpoint_key=None):
+    """
+    Reads the Timesheet transactions grid from an already-open, logged-in workspace session.
+    Used directly by the session daemon, which keeps the browser warm between jobs.
+
+    Args:
+        days_ago (int): Number of days in the past to retrieve data for.
+        extraction_mode (str): "js" to read each screen with one injected script,
+            "helium" for per-cell lookups. See grid_extract.py.
+        full_refresh (bool): Ignore the incremental checkpoint and re-read the whole window.
+        on_entry (callable): Called with each new deduplicated entry as soon as it is parsed.
+        on_progress (callable): Called with keyword progress fields after each grid screen.
+        on_coverage (callable): Called once with the scroller's coverage record (see grid_scroller.py).
+        until_days_ago (int | None): If given, only collect the window [days_ago, until_days_ago);
+            0 means up to now. Used for date-range shards (parallel_runner.py); windowed
+            scrapes, the newest shard included, neither use nor advance the checkpoint.
+        checkpoint_key (str): Whose checkpoint to use, e.g. the app's user id (see scrape_checkpoint.py).
+
+    Returns:
+        list: The collected entries (Date, Project, Activity, WorkItem, Hours, Comment).
+    """
+    from helium import click # Imported here so --help and the OData path never load the browser stack
+
+    entries = []
+    seen_keys = set() # entry_key() of every collected entry, for O(1) duplicate checks
+    reset_wait_timings()
+    # 2. Click on the timesheets button/link
+    try:
+        with span("grid_open"):
+            click("Timesheet transactions")
+            # It's better to wait for the element to be present
+            if not is_headless_session(): # Headless windows can't be maximized; they start desktop-sized
+                get_driver().maximize_window()
+            if wait_for_rows_settled(GRID_ROW_SELECTOR, "grid_load"):
+                log_message("Grid loaded.")
+            else:
+                log_message("Grid did not settle before the timeout. Continuing with whatever is rendered.")
+    except Exception as e_click:
+        log_message(f"Error clicking Timesheet transactions': {e_click}. The page might not have loaded as expected or the selector is incorrect.")
+        # Decide if to continue or exit. For now, try to continue if possible.
+        
+    # 3. Capture data in the grid
+    target_date = get_date_days_ago(days=days_ago)        
+    # Stop at the previous run's high-water mark when everything older is already known
+    windowed = until_days_ago is not None
+    upper_date = get_date_days_ago(days=until_days_ago) if until_days_ago else None
+    checkpoint = None if full_refresh or windowed else load_checkpoint(checkpoint_path(checkpoint_key))
+    cutoff_date = get_scrape_cutoff(target_date, checkpoint)
+    used_checkpoint = cutoff_date > target_date
+    if used_checkpoint:
+        log_message(f"Incremental scrape: stopping at {cutoff_date:%Y-%m-%d} (checkpoint high-water mark {checkpoint['high_water_mark']}).")
+    
+    coverage = new_coverage()
+    newest_date = None
+    earliest_date = None
+    row_idx = 0
+    try:
+        # Hours are not reliably scraped or needed for AI context.
+        for viewport_rows in iter_grid_viewports(coverage, extraction_mode=extraction_mode, cutoff_date=cutoff_date):
+            for (date_str, project_str, activity_str, workitem_str, comment_str), entry_date_obj in viewport_rows:
+                # Log the 5 variables for debugging
+                log_message(f"Row {row_idx} - Date: '{date_str}', Project: '{project_str}', Activity: '{activity_str}', WorkItem: '{workitem_str}', Comment: '{comment_str}'")
+                row_idx += 1
+                if entry_date_obj is None:
+                    log_message(f"Could not parse date string: '{date_str}' for row {row_idx - 1}. Skipping date filter for this row, but will include.")
+                    formatted_date_str = date_str
+                else:
+                    formatted_date_str = entry_date_obj.date().isoformat() # Standardize
+                    if entry_date_obj < cutoff_date:
+                        continue # Older than wanted; the scroller decides when to stop
+                    if upper_date and entry_date_obj >= upper_date:
+                        continue # Newer than this shard's window; another worker collects it
+                    if newest_date is None or entry_date_obj > newest_date:
+                        newest_date = entry_date_obj
+                    if earliest_date is None or entry_date_obj < earliest_date:
+                        earliest_date = entry_date_obj
+
+                entry_data = {
+                    "Date": formatted_date_str, 
+                    "Project": project_str, 
+                    "Activity": activity_str, 
+                    "WorkItem": workitem_str, 
+                    "Hours": "", # Hours are not critical for historical context for AI and often not reliably scraped.
+                    "Comment": comment_str
+                }
+                # Check if this entry already exists (by Date, Project, Activity, WorkItem)
+                key = entry_key(entry_data)
+                if key in seen_keys:
+                    log_message(f"Skipping duplicate entry for {formatted_date_str}/{project_str}/{activity_str}/{workitem_str}")
+                else:
+                    seen_keys.add(key)
+                    entries.append(entry_data)
+                    if on_entry:
+                        on_entry(entry_data)
+
+            if on_progress:
+                on_progress(scroll=coverage["viewports"], entries=len(entries),
+                            earliest_date=earliest_date.strftime("%Y-%m-%d") if earliest_date else None)
+    except Exception as e_row:
+        log_message(f"Error processing a row set ({row_idx}): {e_row}")
+        coverage["stop_reason"] = "error"
+        coverage["complete"] = False
+
+    coverage["entries_collected"] = len(entries)
+    log_message(f"Grid coverage: {json.dumps(coverage)}")
+    tracing.emit(dict({"type": "grid_coverage", "run": tracing.summary()["run"]}, **coverage))
+    if on_coverage:
+        on_coverage(coverage)
+    reached_cutoff = coverage["complete"]
+    log_message(f"Scraping finished. Total entries collected: {len(entries)}")
+    if windowed:
+        log_message("Date-range shard; checkpoint left unchanged.") # It doesn't cover the whole history
+    elif reached_cutoff:
+        save_checkpoint(target_date, newest_date, checkpoint, used_checkpoint, path=checkpoint_path(checkpoint_key))
+    else:
+        log_message("Scrape did not cover its whole window; checkpoint not advanced.")
+    log_message(f"Wait timings: {json.dumps(summarize_waits())}")
+    seed_from_history(entries, log_message)
+    return entries
+
+def collect_timesheet_entries_odata(days_ago=30, full_refresh=False, client=None, checkpoint_key=None):
+    """
+    Fetches the same entries as collect_timesheet_entries from the OData endpoint,
+    filtered server-side to the checkpoint cutoff, without a browser.
+
+    Raises:
+        ODataError: If the OData path is unavailable; the caller should fall back to the grid.
+    """
+    client = client or create_client_from_saved_login()
+    target_date = get_date_days_ago(days=days_ago)
+    checkpoint = None if full_refresh else load_checkpoint(checkpoint_path(checkpoint_key))
+    cutoff_date = get_scrape_cutoff(target_date, checkpoint)
+    used_checkpoint = cutoff_date > target_date
+    with span("odata_fetch", since=cutoff_date.strftime("%Y-%m-%d")):
+        rows = client.fetch_entries(cutoff_date)
+    tracing.count("odata_requests", client.requests_made)
+
+    entries = []
+    seen_keys = set()
+    newest_date = None
+    for entry in rows:
+        key = entry_key(entry)
+        if key in seen_keys:
+            continue
+        seen_keys.add(key)
+        entries.append(entry)
+        try:
+            entry_day = parse_entry_date(entry["Date"])
+        except ValueError:
+            continue
+        entry_date_obj = datetime(entry_day.year, entry_day.month, entry_day.day)
+        if newest_date is None or entry_date_obj > newest_date:
+            newest_date = entry_date_obj
+    log_message(f"OData fetch finished. {len(entries)} entries in {client.requests_made} requests.")
+    # The server-side filter covers the whole window, so the cutoff is always reached
+    save_checkpoint(target_date, newest_date, checkpoint, used_checkpoint, path=checkpoint_path(checkpoint_key))
+    seed_from_history(entries, log_message)
+    return entries
+
+def scrape_via_odata(days_ago, full_refresh, output_format, checkpoint_key=None):
+    """
+    Scrapes through the OData backend and prints the result in output_format.
+    Returns False when OData is unavailable and the caller should use the browser.
+    """
+    try:
+        entries = collect_timesheet_entries_odata(days_ago=days_ago, full_refresh=full_refresh,
+                                                  checkpoint_key=checkpoint_key)
+    except ODataError as e_odata:
+        log_message(f"OData backend unavailable: {e_odata}")
+        return False
+    if output_format == "ndjson":
+        writer = NdjsonWriter()
+        for entry in entries:
+            writer.emit("entry", entry=entry)
+        writer.emit("done", status="ok", entries=len(entries), elapsed_secs=writer.elapsed_secs())
+    else:
+        log_message(f"Finalizing. Outputting {len(entries)} entries from OData as JSON.")
+        print(json.dumps(entries))
+    return True
+
+def ndjson_callbacks(writer):
+    """collect_timesheet_entries callbacks that stream entries and progress as NDJSON records."""
+    def on_entry(entry):
+        writer.emit("entry", entry=entry)
+
+    def on_progress(**progress):
+        writer.emit("progress", elapsed_secs=writer.elapsed_secs(), **progress)
+
+    def on_coverage(coverage):
+        writer.emit("coverage", **coverage)
+
+    return {"on_entry": on_entry, "on_progress": on_progress, "on_coverage": on_coverage}
+
+def scrape_timesheet_data(days_ago=30, extraction_mode="js", full_refresh=False, output_format="json",
+                          checkpoint_key=None):
+    """
+    Scrapes timesheet data from XYZ.com.
+    This is a conceptual script and needs actual selectors and logic for XYZ.com.
+    Hours are generally not scraped or considered essential for historical context for AI.
+    
+    Args:
+        days_ago (int): Number of days in the past to retrieve data for. Default is 90 days.
+        extraction_mode (str): "js" (bulk) or "helium" (per-cell) grid reading.
+        full_refresh (bool): Ignore the incremental checkpoint.
+        output_format (str): "json" prints one array at exit; "ndjson" streams records
+            as they are parsed (see ndjson_stream.py).
+        checkpoint_key (str): Whose incremental checkpoint to use (see scrape_checkpoint.py).
+    """
+    entries = []
+    writer = NdjsonWriter() if output_format == "ndjson" else None
+    scrape_failed = False
+    
+    try:
+        with Heartbeat(writer) if writer else nullcontext():
+            # 1. Go to XYZ.com and wait for user login
+            start_workspace_session(log_message)
+
+            # 2-3. Open Timesheet transactions and capture data in the grid
+            entries = collect_timesheet_entries(days_ago=days_ago, extraction_mode=extraction_mode,
+                                                full_refresh=full_refresh, checkpoint_key=checkpoint_key,
+                                                **(ndjson_callbacks(writer) if writer else {}))
+
+    except Exception as e_main:
+        log_message(f"An critical error occurred during scraping process: {e_main}")
+        scrape_failed = True
+        if writer:
+            # Entries streamed so far stay valid; just close the stream with the error
+            writer.emit("done", status="error", error=str(e_main), elapsed_secs=writer.elapsed_secs())
+        else:
+            # Output an empty JSON array or partial data if preferred on critical error
+            # For Node.js, ensure any output is valid JSON.
+            print(json.dumps([])) # Output empty list on critical error
+        sys.exit(1) # Indicate failure to Node.js
+        return # Exit function
+    
+    finally:
+        close_session(log_message)
+
+        if writer is None:
+            # Output the collected data as JSON to stdout
+            # This will be captured by the Node.js server action
+            # Ensure it's always valid JSON, even if empty
+            log_message(f"Finalizing. Outputting {len(entries)} entries as JSON.")
+            print(json.dumps(entries if entries else []))
+        elif not scrape_failed:
+            log_message(f"Finalizing. Streamed {len(entries)} entries as NDJSON.")
+            writer.emit("done", status="ok", entries=len(entries), elapsed_secs=writer.elapsed_secs())
+
+def scrape_via_daemon_ndjson(params):
+    """
+    Streams a session daemon scrape as NDJSON. Returns False when no daemon is
+    running and the caller should scrape locally.
+    """
+    writer = NdjsonWriter()
+    with Heartbeat(writer):
+        daemon_response = run_via_daemon("scrape", dict(params, stream=True), log_message,
+                                         on_stream=writer.emit_record)
+    if daemon_response is None:
+        return False
+    if daemon_response.get("ok"):
+        entry_count = (daemon_response.get("result") or {}).get("entries", 0)
+        writer.emit("done", status="ok", entries=entry_count, elapsed_secs=writer.elapsed_secs())
+    else:
+        log_message(f"Session daemon failed to scrape: {daemon_response.get('error')}")
+        writer.emit("done", status="error", error=daemon_response.get("error"), elapsed_secs=writer.elapsed_secs())
+        sys.exit(1)
+    return True
+
+def run_scrape_main(args, days):
+    """Runs the scrape requested on the command line, via the session daemon when one is running."""
+    # Reuse the warm browser of a running session_daemon.py when there is one;
+    # otherwise pay the full Chrome start and login wait in this process.
+    scrape_params = {"days_ago": days, "extraction_mode": args.extraction, "full_refresh": args.full,
+                     "checkpoint_key": args.checkpoint_key}
+    if args.backend != "browser":
+        # Bulk HTTP needs no browser at all, so it goes before the daemon and the grid
+        if scrape_via_odata(days, args.full, args.format, checkpoint_key=args.checkpoint_key):
+            return
+        if args.backend == "odata":
+            log_message("OData backend requested but unavailable; not falling back to the browser.")
+            if args.format == "ndjson":
+                NdjsonWriter().emit("done", status="error", error="OData backend unavailable.", elapsed_secs=0)
+            else:
+                print(json.dumps([]))
+            sys.exit(1)
+        log_message("Falling back to the browser grid.")
+    if args.format == "ndjson":
+        if not scrape_via_daemon_ndjson(scrape_params):
+            scrape_timesheet_data(days_ago=days, extraction_mode=args.extraction, full_refresh=args.full,
+                                  output_format="ndjson", checkpoint_key=args.checkpoint_key)
+        return
+
+    daemon_response = run_via_daemon("scrape", scrape_params, log_message)
+    if daemon_response is None:
+        scrape_timesheet_data(days_ago=days, extraction_mode=args.extraction, full_refresh=args.full,
+                              checkpoint_key=args.checkpoint_key)
+    elif daemon_response.get("ok"):
+        entries = daemon_response.get("result") or []
+        log_message(f"Finalizing. Outputting {len(entries)} entries from session daemon as JSON.")
+        print(json.dumps(entries))
+    else:
+        log_message(f"Session daemon failed to scrape: {daemon_response.get('error')}")
+        print(json.dumps([]))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    # Redirect stdout to ensure it's UTF-8, which Node.js expects
+    # sys.stdout = open(sys.stdout.fileno(), mode='w', encoding='utf8', buffering=1)
+    # sys.stderr = open(sys.stderr.fileno(), mode='w', encoding='utf8', buffering=1)
+    
+    parser = argparse.ArgumentParser(description="Scrape historical timesheet transactions as JSON.")
+    parser.add_argument("days", nargs="?", help="Number of days of history to retrieve (default 30).")
+    parser.add_argument("--extraction", choices=EXTRACTION_MODES, default="js",
+                        help="Grid reading strategy: one injected script per screen (js) or per-cell Helium lookups.")
+    parser.add_argument("--full", action="store_true",
+                        help="Re-read the whole history window instead of stopping at the last checkpoint.")
+    parser.add_argument("--checkpoint-key", metavar="KEY",
+                        help="Keep a separate incremental checkpoint for this key, e.g. the app's user id.")
+    parser.add_argument("--format", choices=("json", "ndjson"), default="json",
+                        help="json: one array at exit. ndjson: stream entry/progress/heartbeat/done records.")
+    parser.add_argument("--backend", choices=SCRAPE_BACKENDS, default="auto",
+                        help="auto: OData with the saved login, falling back to the browser grid. "
+                             "odata / browser: only that backend.")
+    args = parser.parse_args()
+
+    # Check if days parameter was provided as command line argument
+    days = 30  # Default to 90 days
+    if args.days is not None:
+        try:
+            days = int(args.days)
+            log_message(f"Using provided days parameter: {days}")
+        except ValueError:
+            log_message(f"Invalid days parameter provided: {args.days}. Using default (30 days)")
+    
+    log_message("Python script execution started.")
+    tracing.start_run("scrape_timesheets")
+    try:
+        run_scrape_main(args, days)
+    finally:
+        tracing.finish_run()
+    log_message("Python script execution finished.")
@@ -0,0 +1,288 @@
+# Long-lived worker that keeps one authenticated Chrome session warm and runs
+# scrape/submit jobs on it, so repeated operations skip the Chrome cold start
+# and the Azure AD login wait.
+#
+# Usage:
+#   python -m chronoassist daemon             # listen on a local TCP port (written to the state file)
+#   python -m chronoassist daemon --port 8765 # listen on a fixed local port
+#   python -m chronoassist daemon --stdio     # read requests from stdin, write responses to stdout
+#
+# Protocol: one JSON object per line in each direction.
+#   request:  {"op": "ping" | "health" | "scrape" | "submit" | "restart" | "shutdown",
+#              "params": {...}, "token": "<from state file, TCP only>", "id": <optional>}
+#   response: {"id": <echoed>, "ok": true, "result": ...} or {"id": ..., "ok": false, "error": "..."}
+# A scrape with params {"stream": true} first sends {"id": ..., "stream": <ndjson record>} lines
+# for each entry and progress record, then the final response with result {"entries": n}.
+
+import argparse
+import json
+import os
+import secrets
+import socketserver
+import sys
+import threading
+import time
+
+from chronoassist.browser_session import (
+    start_workspace_session, return_to_workspace, get_session_status, close_session, get_driver
+)
+from chronoassist.daemon_client import DAEMON_STATE_FILE, DAEMON_HOST
+from chronoassist import tracing
+
+HEALTH_CHECK_INTERVAL_SECS = 60
+
+
+def log_message(message):
+    print(f"PYTHON_DAEMON_LOG: {message}", file=sys.stderr)
+
+
+class SessionDaemon:
+    """Owns the browser session and serializes jobs on it."""
+
+    def __init__(self, health_check_interval_secs=HEALTH_CHECK_INTERVAL_SECS):
+        self.health_check_interval_secs = health_check_interval_secs
+        self.token = secrets.token_hex(16)
+        self.job_lock = threading.Lock() # Helium drives a single global browser
+        self.stop_event = threading.Event()
+        self.started_at = time.time()
+        self.jobs_completed = 0
+        self.sessions_started = 0
+        self.last_error = None
+
+    # ---- Session lifecycle ----
+
+    def restart_session(self, reason):
+        log_message(f"(Re)starting browser session: {reason}")
+        close_session(log_message)
+        start_workspace_session(log_message)
+        self.sessions_started += 1
+
+    def ensure_session(self):
+        """Makes sure the browser is up, logged in and on the workspace landing page."""
+        status = get_session_status()
+        if status in ("stopped", "expired"):
+            self.restart_session(f"session {status}")
+            return
+        try:
+            # Jobs start from the landing page; navigating back is cheap while warm.
+            return_to_workspace(log_message)
+        except Exception as e_nav:
+            self.restart_session(f"could not return to workspace ({e_nav})")
+
+    def health(self):
+        busy = self.job_lock.locked()
+        return {
+            "status": "busy" if busy else get_session_status(),
+            "busy": busy,
+            "pid": os.getpid(),
+            "uptime_secs": round(time.time() - self.started_at, 1),
+            "jobs_completed": self.jobs_completed,
+            "sessions_started": self.sessions_started,
+            "last_error": self.last_error,
+        }
+
+    def watch_session(self):
+        """Background health check: restart the browser if it died or the login expired."""
+        while not self.stop_event.wait(self.health_check_interval_secs):
+            if not self.job_lock.acquire(blocking=False):
+                continue # A job is running; it will call ensure_session itself
+            try:
+                status = get_session_status()
+                if status in ("stopped", "expired"):
+                    self.restart_session(f"health check found session {status}")
+            except Exception as e_watch:
+                self.last_error = f"Health check restart failed: {e_watch}"
+                log_message(self.last_error)
+            finally:
+                self.job_lock.release()
+
+    # ---- Jobs ----
+
+    def run_job(self, op, params, emit=None, response=None):
+        """
+        Runs one scrape or submit job on the warm session and returns its result.
+        The job's tracing summary is stored in response["trace"], even if the job fails.
+        """
+        with self.job_lock:
+            # The tracing run is module-global, so it starts and ends under the
+            # lock; a request arriving meanwhile can't reset this job's counters
+            tracing.start_run(f"session_daemon.{op}")
+            try:
+                result = self.run_job_in_session(op, params, emit)
+            finally:
+                # The session outlives the job, so close_session won't capture it
+                tracing.capture_performance_log(get_driver())
+                trace = tracing.finish_run()
+                if response is not None:
+                    response["trace"] = trace
+            return result
+
+    def run_job_in_session(self, op, params, emit):
+        self.ensure_session()
+        if op == "scrape":
+            # Imported here so the scripts can import daemon_client without a cycle
+            from chronoassist.scrape_timesheets import collect_timesheet_entries
+            callbacks = {}
+            if params.get("stream") and emit:
+                callbacks = {
+                    "on_entry": lambda entry: emit({"type": "entry", "entry": entry}),
+                    "on_progress": lambda **progress: emit(dict({"type": "progress"}, **progress)),
+                    "on_coverage": lambda coverage: emit(dict({"type": "coverage"}, **coverage)),
+                }
+            result = collect_timesheet_entries(days_ago=int(params.get("days_ago", 30)),
+                                               extraction_mode=params.get("extraction_mode", "js"),
+                                               full_refresh=bool(params.get("full_refresh")),
+                                               checkpoint_key=params.get("checkpoint_key"),
+                                               **callbacks)
+            if callbacks:
+                result = {"entries": len(result)} # Rows were already streamed
+        else:
+            from chronoassist.submit_timesheets import submit_entries_in_session
+            result = submit_entries_in_session(
+                params.get("entries") or [], mode=params.get("mode", "single"),
+                use_journal=params.get("use_journal", True), retry_in_doubt=params.get("retry_in_doubt", False),
+                retry_rejected=params.get("retry_rejected", False))
+        self.jobs_completed += 1
+        return result
+
+    def handle_request(self, request, check_token=True, send_line=None):
+        """
+        Dispatches one decoded request and returns the response dictionary.
+        send_line, if given, writes interim stream lines back to the requester.
+        """
+        response = {"id": request.get("id")}
+        if check_token and request.get("token") != self.token:
+            response.update(ok=False, error="Invalid or missing daemon token.")
+            return response
+        op = request.get("op")
+        params = request.get("params") or {}
+        try:
+            if op == "ping":
+                result = {"pong": True}
+            elif op == "health":
+                result = self.health()
+            elif op in ("scrape", "submit"):
+                log_message(f"Running '{op}' job.")
+                job_started = time.time()
+                emit = None
+                if send_line:
+                    emit = lambda record: send_line({"id": request.get("id"), "stream": record})
+                result = self.run_job(op, params, emit=emit, response=response)
+                log_message(f"'{op}' job finished in {time.time() - job_started:.1f}s.")
+            elif op == "restart":
+                with self.job_lock:
+                    self.restart_session("restart requested")
+                result = self.health()
+            elif op == "shutdown":
+                self.stop_event.set()
+                result = {"stopping": True}
+            else:
+                raise ValueError(f"Unknown op: {op}")
+            response.update(ok=True, result=result)
+        except Exception as e_job:
+            self.last_error = f"{op} failed: {e_job}"
+            log_message(self.last_error)
+            response.update(ok=False, error=str(e_job))
+        return response
+
+    # ---- Transports ----
+
+    @staticmethod
+    def print_line(message):
+        print(json.dumps(message), flush=True)
+
+    def serve_stdio(self):
+        """Line protocol over stdin/stdout, for a parent process that keeps the pipe open."""
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e_json:
+                response = {"ok": False, "error": f"Invalid JSON request: {e_json}"}
+            else:
+                response = self.handle_request(request, check_token=False, send_line=self.print_line)
+            self.print_line(response)
+            if self.stop_event.is_set():
+                break
+
+    def serve_tcp(self, port=0):
+        """Line protocol over a localhost socket; the chosen port is published in the state file."""
+        daemon = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def send_line(self, message):
+                self.wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+                self.wfile.flush()
+
+            def handle(self):
+                for raw_line in self.rfile:
+                    line = raw_line.decode("utf-8").strip()
+                    if not line:
+                        continue
+                    try:
+                        response = daemon.handle_request(json.loads(line), send_line=self.send_line)
+                    except ValueError as e_json:
+                        response = {"ok": False, "error": f"Invalid JSON request: {e_json}"}
+                    self.send_line(response)
+                if daemon.stop_event.is_set():
+                    threading.Thread(target=server.shutdown, daemon=True).start()
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        server = socketserver.ThreadingTCPServer((DAEMON_HOST, port), RequestHandler)
+        server.daemon_threads = True
+        self.write_state_file(server.server_address[1])
+        log_message(f"Session daemon listening on {DAEMON_HOST}:{server.server_address[1]}.")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            self.remove_state_file()
+
+    def write_state_file(self, port):
+        state = {"port": port, "pid": os.getpid(), "token": self.token}
+        os.makedirs(os.path.dirname(DAEMON_STATE_FILE), exist_ok=True)
+        # Only the owning user may read the token
+        fd = os.open(DAEMON_STATE_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as state_file:
+            json.dump(state, state_file)
+
+    def remove_state_file(self):
+        try:
+            os.remove(DAEMON_STATE_FILE)
+        except OSError:
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep a warm ChronoAssist browser session and run jobs on it.")
+    parser.add_argument("--stdio", action="store_true", help="Serve the line protocol on stdin/stdout instead of TCP.")
+    parser.add_argument("--port", type=int, default=0, help="Local TCP port (default: any free port).")
+    parser.add_argument("--health-interval", type=int, default=HEALTH_CHECK_INTERVAL_SECS,
+                        help="Seconds between background session health checks.")
+    parser.add_argument("--lazy", action="store_true", help="Don't open the browser until the first job.")
+    args = parser.parse_args(argv)
+
+    daemon = SessionDaemon(health_check_interval_secs=args.health_interval)
+    if not args.lazy:
+        try:
+            daemon.restart_session("daemon start-up")
+        except Exception as e_start:
+            daemon.last_error = f"Initial session start failed: {e_start}"
+            log_message(daemon.last_error)
+    threading.Thread(target=daemon.watch_session, daemon=True).start()
+
+    try:
+        if args.stdio:
+            daemon.serve_stdio()
+        else:
+            daemon.serve_tcp(port=args.port)
+    finally:
+        daemon.stop_event.set()
+        close_session(log_message)
+        log_message("Session daemon stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# Write-ahead journal that makes submission idempotent and resumable.
+#
+# Every entry is recorded as "pending" before the browser touches it and as
+# "submitted" or "failed" right after, keyed by client_id plus a hash of the
+# entry's content. If the script dies partway (the spawnSync timeout, a Chrome
+# crash, an expired session), a retry skips what already went through, and the
+# entry that was in flight is reported as in doubt instead of being entered twice.
+
+from datetime import datetime, timedelta
+import hashlib
+import os
+import sqlite3
+
+from chronoassist.browser_session import PROFILE_BASE_DIR
+
+JOURNAL_FILE = os.path.join(PROFILE_BASE_DIR, "submission_journal.db")
+JOURNAL_RETENTION_DAYS = 90
+
+STATUS_PENDING = "pending"
+STATUS_SUBMITTED = "submitted"
+STATUS_FAILED = "failed"
+
+IN_DOUBT_ERROR = ("A previous submission attempt was interrupted while entering this entry. "
+                  "Check XYZ.com for it, then retry with --retry-in-doubt if it is missing.")
+
+
+def format_hours(hours):
+    """Renders Hours the way JavaScript's String(number) does, so 2.0 and 2 hash the same."""
+    if isinstance(hours, float) and hours.is_integer():
+        return str(int(hours))
+    return str(hours) if hours is not None else ""
+
+
+def content_hash(entry):
+    """SHA-256 over the same fields, in the same order, as generateEntryHash in src/lib/db.ts."""
+    hashable_string = "-".join([
+        str(entry.get('Date', '')), str(entry.get('Project', '')), str(entry.get('Activity', '')),
+        str(entry.get('WorkItem', '')), str(entry.get('Comment', '')), format_hours(entry.get('Hours')),
+    ])
+    return hashlib.sha256(hashable_string.encode("utf-8")).hexdigest()
+
+
+class SubmissionJournal:
+    """SQLite-backed record of submission attempts, one row per (client_id, content hash)."""
+
+    def __init__(self, path=JOURNAL_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Parallel workers share the file; WAL plus a busy timeout keeps their writes from failing
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS submissions (
+                client_id TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (client_id, content_hash)
+            )
+        """)
+        cutoff = (datetime.now() - timedelta(days=JOURNAL_RETENTION_DAYS)).isoformat(timespec="seconds")
+        self.conn.execute("DELETE FROM submissions WHERE updated_at < ?", (cutoff,))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def get_status(self, entry):
+        row = self.conn.execute(
+            "SELECT status FROM submissions WHERE client_id = ? AND content_hash = ?",
+            (entry.get('id'), content_hash(entry)),
+        ).fetchone()
+        return row[0] if row else None
+
+    def partition(self, entries_data, retry_in_doubt=False):
+        """
+        Splits entries by what the journal knows about them.
+
+        Returns:
+            tuple: (entries_to_submit, already_submitted_client_ids, in_doubt_failures), where
+            in_doubt_failures are failedEntries records for entries left "pending" by a crash.
+        """
+        entries_to_submit = []
+        already_submitted_client_ids = []
+        in_doubt_failures = []
+        for entry in entries_data:
+            status = self.get_status(entry) if entry.get('id') else None
+            if status == STATUS_SUBMITTED:
+                already_submitted_client_ids.append(entry['id'])
+            elif status == STATUS_PENDING and not retry_in_doubt:
+                in_doubt_failures.append({"client_id": entry['id'], "error": IN_DOUBT_ERROR})
+            else:
+                entries_to_submit.append(entry)
+        return entries_to_submit, already_submitted_client_ids, in_doubt_failures
+
+    def record(self, entries, status, error=None):
+        """Records the new status of entries and commits immediately, so it survives a crash."""
+        now = datetime.now().isoformat(timespec="seconds")
+        with self.conn:
+            for entry in entries:
+                if not entry.get('id'):
+                    continue
+                self.conn.execute("""
+                    INSERT INTO submissions (client_id, content_hash, status, error, attempts, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(client_id, content_hash) DO UPDATE SET
+                        status = excluded.status,
+                        error = excluded.error,
+                        attempts = submissions.attempts + excluded.attempts,
+                        updated_at = excluded.updated_at
+                """, (entry['id'], content_hash(entry), status, error,
+                      1 if status == STATUS_PENDING else 0, now))
+
+    def mark_pending(self, entries):
+        self.record(entries, STATUS_PENDING)
+
+    def mark_submitted(self, entry):
+        self.record([entry], STATUS_SUBMITTED)
+
+    def mark_failed(self, entry, error):
+        self.record([entry], STATUS_FAILED, error)
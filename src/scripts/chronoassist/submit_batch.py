@@ -0,0 +1,225 @@
+# Batch submission engine for submit_timesheets.py.
+#
+# Instead of one Helium round trip sequence per entry (wait for "Hours", click,
+# settle, TAB/write per field), entries are grouped by timesheet week and
+# project and each group is entered with a single injected asynchronous script
+# that adds the grid lines and fills every field in the page itself. Results are
+# still reported per client_id, so the submittedEntryClientIds / failedEntries
+# contract is unchanged.
+
+import sys
+
+from chronoassist.browser_session import get_driver
+from chronoassist.dates import parse_entry_date, format_grid_date
+from chronoassist.tracing import span
+
+# Upper bound on lines entered by one script call; keeps each call well inside
+# the script timeout and limits how much a single failure can affect.
+BATCH_MAX_ROWS = 20
+NEW_LINE_TIMEOUT_MS = 10000
+NEW_LINE_BUTTON_TEXT = "Hours"
+ENTRY_ROW_SELECTOR = "[role='row']"
+# TimeEntry field -> aria-label of the grid input it goes into
+GRID_FIELDS = [
+    ("Date", "Date"),
+    ("Project", "Project"),
+    ("Activity", "Activity"),
+    ("WorkItem", "Work item"),
+    ("Hours", "Hours"),
+    ("Comment", "External comment"),
+]
+# Reported for every entry of a batch whose script call failed after adding lines;
+# the journal keeps them pending, so a later run does not enter them blindly either.
+BATCH_IN_DOUBT_ERROR = ("The batch was interrupted after {added} of its grid lines were added, so this entry "
+                        "may already be entered. Check XYZ.com for it, then retry with --retry-in-doubt if it is missing.")
+COUNT_ROWS_SCRIPT = "return document.querySelectorAll(arguments[0]).length;"
+
+# Adds one grid line per row and fills its inputs. Values are set through the
+# native value setter and followed by input/change/blur events so the page's
+# own bindings pick them up. Calls back with one {ok, error} per row.
+FILL_ROWS_SCRIPT = """
+var rows = arguments[0], options = arguments[1], done = arguments[arguments.length - 1];
+var results = [];
+var valueSetter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+
+function findNewLineButton() {
+    var buttons = document.querySelectorAll("button");
+    for (var i = 0; i < buttons.length; i++) {
+        var label = (buttons[i].getAttribute('aria-label') || buttons[i].textContent || '').trim();
+        if (label === options.newLineText) { return buttons[i]; }
+    }
+    return null;
+}
+
+function setValue(input, value) {
+    input.focus();
+    valueSetter.call(input, value);
+    input.dispatchEvent(new Event('input', {bubbles: true}));
+    input.dispatchEvent(new Event('change', {bubbles: true}));
+    input.dispatchEvent(new Event('blur'));
+}
+
+function waitForNewRow(previousCount, deadline, callback) {
+    var rowEls = document.querySelectorAll(options.rowSelector);
+    if (rowEls.length > previousCount) { return callback(rowEls[rowEls.length - 1]); }
+    if (Date.now() > deadline) { return callback(null); }
+    setTimeout(function () { waitForNewRow(previousCount, deadline, callback); }, 50);
+}
+
+function fillNext(i) {
+    if (i >= rows.length) { return done(results); }
+    var button = findNewLineButton();
+    if (!button) {
+        results.push({ok: false, error: "Could not find the '" + options.newLineText + "' button."});
+        return fillNext(i + 1);
+    }
+    var previousCount = document.querySelectorAll(options.rowSelector).length;
+    button.click();
+    waitForNewRow(previousCount, Date.now() + options.newLineTimeoutMs, function (rowEl) {
+        if (!rowEl) {
+            results.push({ok: false, error: "Timed out waiting for a new grid line."});
+            return fillNext(i + 1);
+        }
+        var missing = [];
+        for (var f = 0; f < options.fields.length; f++) {
+            var key = options.fields[f][0], label = options.fields[f][1];
+            var input = rowEl.querySelector("input[aria-label='" + label + "']");
+            if (!input) { missing.push(label); continue; }
+            setValue(input, rows[i][key] == null ? '' : String(rows[i][key]));
+        }
+        results.push(missing.length ? {ok: false, error: "Grid line is missing fields: " + missing.join(', ')} : {ok: true});
+        fillNext(i + 1);
+    });
+}
+
+fillNext(0);
+"""
+
+
+def log_message(message):
+    print(f"PYTHON_SUBMIT_LOG: {message}", file=sys.stderr)
+
+
+def group_entries_for_batch(entries_data, max_rows=BATCH_MAX_ROWS):
+    """
+    Groups entries by timesheet week and project, preserving input order within a
+    group, and splits groups larger than max_rows.
+
+    Returns:
+        list: Lists of (entry, date_obj) pairs, one list per script call.
+    """
+    groups = {}
+    for entry, date_obj in entries_data:
+        iso_year, iso_week, _ = date_obj.isocalendar()
+        groups.setdefault((iso_year, iso_week, entry.get('Project', '')), []).append((entry, date_obj))
+    batches = []
+    for group_key in sorted(groups):
+        group = groups[group_key]
+        for start in range(0, len(group), max_rows):
+            batches.append(group[start:start + max_rows])
+    return batches
+
+
+def count_entry_rows():
+    """Number of grid lines currently on the page."""
+    return get_driver().execute_script(COUNT_ROWS_SCRIPT, ENTRY_ROW_SELECTOR)
+
+
+def fill_batch(batch, lookups=None):
+    """
+    Enters one batch with a single script call. Returns one {ok, error} per entry.
+    With 'lookups' (a LookupCache), lookup fields get their cached exact keys.
+    """
+    rows = []
+    for entry, date_obj in batch:
+        values = lookups.resolve_entry(entry) if lookups else entry
+        row = {key: values.get(key, '') for key, _ in GRID_FIELDS}
+        row["Date"] = format_grid_date(date_obj)
+        rows.append(row)
+    options = {
+        "newLineText": NEW_LINE_BUTTON_TEXT,
+        "rowSelector": ENTRY_ROW_SELECTOR,
+        "newLineTimeoutMs": NEW_LINE_TIMEOUT_MS,
+        "fields": [list(field) for field in GRID_FIELDS],
+    }
+    driver = get_driver()
+    driver.set_script_timeout(len(rows) * NEW_LINE_TIMEOUT_MS / 1000 + 10)
+    results = driver.execute_async_script(FILL_ROWS_SCRIPT, rows, options)
+    if not isinstance(results, list) or len(results) != len(rows):
+        raise ValueError(f"Batch fill script returned {results!r} for {len(rows)} rows.")
+    return results
+
+
+def submit_entries_in_batches(entries_data, fallback_submit, journal=None, lookups=None):
+    """
+    Submits entries through the batch engine.
+
+    Args:
+        entries_data (list): TimeEntry dictionaries; 'id' is the client_id.
+        fallback_submit (callable): Per-entry submitter used for a batch whose
+            script call fails before adding any grid line. Takes a list of entries
+            and returns (submitted_client_ids, failed_entries). A batch that fails
+            after adding lines is reported as in doubt instead of re-entered.
+        journal (SubmissionJournal): If given, each batch is journaled as pending
+            before its script call and each entry's outcome right after.
+        lookups (LookupCache): If given, used to fill lookup fields by exact key.
+
+    Returns:
+        tuple: (submitted_client_ids, failed_entries) in the result contract's shapes.
+    """
+    submitted_entry_client_ids = []
+    failed_entries_details = []
+
+    # Validate dates up front so bad entries never reach the browser
+    dated_entries = []
+    for index, entry in enumerate(entries_data):
+        client_id = entry.get('id', f"unknown_id_{index}")
+        try:
+            dated_entries.append((entry, parse_entry_date(entry.get('Date'))))
+        except ValueError as e_date:
+            log_message(f"Date formatting error for entry {client_id}: {e_date}")
+            failed_entries_details.append({"client_id": client_id, "error": f"Script error: {e_date}"})
+
+    batches = group_entries_for_batch(dated_entries)
+    log_message(f"Entering {len(dated_entries)} entries in {len(batches)} batches.")
+    for batch_index, batch in enumerate(batches):
+        batch_entries = [entry for entry, _ in batch]
+        if journal:
+            journal.mark_pending(batch_entries)
+        rows_before = None
+        try:
+            with span("submit_batch", batch=batch_index + 1, rows=len(batch)):
+                rows_before = count_entry_rows()
+                results = fill_batch(batch, lookups)
+        except Exception as e_batch:
+            try:
+                added_rows = count_entry_rows() - rows_before if rows_before is not None else 0
+            except Exception as e_count:
+                log_message(f"Could not count grid lines after the failed batch ({e_count}).")
+                added_rows = None
+            if added_rows != 0:
+                # Some lines may be filled already; re-entering the batch would duplicate them
+                log_message(f"Batch {batch_index + 1} failed after adding lines ({e_batch}). Reporting it as in doubt.")
+                in_doubt_error = BATCH_IN_DOUBT_ERROR.format(added="some" if added_rows is None else added_rows)
+                failed_entries_details.extend({"client_id": entry.get('id'), "error": in_doubt_error}
+                                              for entry in batch_entries)
+                continue # Journal entries stay pending
+            log_message(f"Batch {batch_index + 1} failed before adding any line ({e_batch}). Falling back to per-entry submission.")
+            fallback_submitted, fallback_failed = fallback_submit(batch_entries)
+            submitted_entry_client_ids.extend(fallback_submitted)
+            failed_entries_details.extend(fallback_failed)
+            continue
+        for entry, result in zip(batch_entries, results):
+            client_id = entry.get('id')
+            if result.get("ok"):
+                submitted_entry_client_ids.append(client_id)
+                if journal:
+                    journal.mark_submitted(entry)
+            else:
+                log_message(f"Failed to enter entry {client_id}: {result.get('error')}")
+                failed_entries_details.append({"client_id": client_id, "error": f"Script error: {result.get('error')}"})
+                if journal:
+                    journal.mark_failed(entry, failed_entries_details[-1]["error"])
+        log_message(f"Batch {batch_index + 1}/{len(batches)} entered ({len(batch)} lines).")
+
+    return submitted_entry_client_ids, failed_entries_details
@@ -0,0 +1,372 @@
+
+# Conceptual Python script using Helium for submitting time entries
+# To run this, you'll need to install Helium: pip install helium
+# And a compatible web driver (e.g., ChromeDriver for Chrome)
+#
+# Helium is imported only inside the functions that drive the browser, so
+# --help, input validation and importing this module stay fast.
+
+import argparse
+from functools import partial
+import io
+import json
+import sys
+import time
+
+from chronoassist.dates import parse_entry_date, format_grid_date
+from chronoassist.browser_session import start_workspace_session, close_session
+from chronoassist.readiness import wait_for, wait_for_page_settled, summarize_waits, reset_wait_timings
+from chronoassist.submit_batch import submit_entries_in_batches
+from chronoassist.submission_journal import SubmissionJournal
+from chronoassist.retry_scheduler import submit_with_retries
+from chronoassist.lookup_cache import LookupCache
+from chronoassist.entry_input import read_entries, collect_entries
+from chronoassist.daemon_client import run_via_daemon
+from chronoassist import tracing
+from chronoassist.tracing import span, record_span
+
+# Add a log function to help debug issues when running from Node.js
+def log_message(message):
+    print(f"PYTHON_SUBMIT_LOG: {message}", file=sys.stderr)
+
+SUBMISSION_MODES = ("single", "batch")
+
+def submit_entries_in_session(entries_data, mode="single", use_journal=True, retry_in_doubt=False,
+                              retry_rejected=False):
+    """
+    Enters time entries through an already-open, logged-in workspace session.
+    Used directly by the session daemon, which keeps the browser warm between jobs.
+    'mode' is "single" (one entry per Helium sequence) or "batch" (see submit_batch.py).
+    With 'use_journal', entries the submission journal already saw go through are skipped
+    and reported as submitted; see submission_journal.py. Entries whose lookup values the
+    server rejected recently fail without being entered, unless 'retry_rejected' is set;
+    see lookup_cache.py.
+    Returns the same result dictionary as submit_entries_to_xyz.
+    """
+
+    failed_entries_details = []
+    reset_wait_timings()
+
+    journal = SubmissionJournal() if use_journal else None
+    lookup_cache = LookupCache()
+    try:
+        if journal:
+            entries_to_submit, already_submitted_ids, in_doubt_failures = journal.partition(
+                entries_data, retry_in_doubt=retry_in_doubt)
+            if already_submitted_ids or in_doubt_failures:
+                log_message(f"Journal: skipping {len(already_submitted_ids)} already submitted and "
+                            f"{len(in_doubt_failures)} in-doubt entries.")
+        else:
+            entries_to_submit, already_submitted_ids, in_doubt_failures = entries_data, [], []
+
+        if retry_rejected:
+            rejected_failures = [] # Explicit resubmission; an accepted entry clears its rejection
+        else:
+            entries_to_submit, rejected_failures = lookup_cache.partition(entries_to_submit)
+        if rejected_failures:
+            log_message(f"Lookup cache: {len(rejected_failures)} entries use a combination the server rejected recently.")
+
+        if entries_to_submit:
+            submitted_entry_client_ids, failed_entries_details = enter_entries_on_form(
+                entries_to_submit, mode, journal, lookup_cache)
+            lookup_cache.record_outcomes(entries_to_submit, submitted_entry_client_ids, failed_entries_details)
+        else:
+            submitted_entry_client_ids, failed_entries_details = [], []
+    finally:
+        if journal:
+            journal.close()
+        lookup_cache.close()
+
+    submitted_entry_client_ids = already_submitted_ids + submitted_entry_client_ids
+    failed_entries_details = in_doubt_failures + rejected_failures + failed_entries_details
+    all_successful = not failed_entries_details
+
+    if all_successful:
+        final_message = f"All {len(entries_data)} entries submitted successfully."
+    elif not submitted_entry_client_ids and failed_entries_details:
+         final_message = f"All {len(failed_entries_details)} entries failed to submit."
+    else:
+        final_message = f"Submission complete. {len(submitted_entry_client_ids)} entries submitted, {len(failed_entries_details)} entries failed."
+    
+    log_message(final_message)
+    log_message(f"Wait timings: {json.dumps(summarize_waits())}")
+    return {
+        "overallSuccess": all_successful,
+        "message": final_message,
+        "submittedEntryClientIds": submitted_entry_client_ids,
+        "failedEntries": failed_entries_details
+    }
+
+def enter_entries_on_form(entries_data, mode, journal=None, lookups=None):
+    """
+    Opens the registration form and enters the entries. Entries that fail for a
+    transient reason are retried in the same session (see retry_scheduler.py).
+    With 'lookups' (a LookupCache), Project/Activity/WorkItem are filled with their cached exact keys.
+    Returns (submitted_client_ids, failed_entries).
+    """
+    from helium import click, find_all, Button
+
+    failed_entries_details = []
+    registration_buttons = find_all(Button("Registration"))
+    if not registration_buttons:
+        log_message("No Registration button found. Exiting submission.")
+        # If this critical step fails, all entries are considered failed.
+        for entry in entries_data:
+            failed_entries_details.append({
+                "client_id": entry.get('id', f"unknown_id_{entries_data.index(entry)}"), # Use 'id' field which is the client_id
+                "error": "Setup Error: Could not find 'Registration' button on page."
+            })
+        return [], failed_entries_details
+    
+    # Heuristic: if multiple "Registration" buttons, the second one might be the correct one.
+    # This needs to be verified against the actual UI.
+    click_target_registration = registration_buttons[1] if len(registration_buttons) > 1 else registration_buttons[0]
+    with span("registration_open"):
+        click(click_target_registration)
+        # Wait for the timesheet entry interface to load
+        wait_for_page_settled("registration_form")
+    log_message(f"Ready to process {len(entries_data)} entries for submission.")
+
+    if mode == "batch":
+        submit_pass = partial(submit_entries_in_batches,
+                              fallback_submit=partial(submit_entries_one_by_one, journal=journal, lookups=lookups),
+                              journal=journal, lookups=lookups)
+    else:
+        submit_pass = partial(submit_entries_one_by_one, journal=journal, lookups=lookups)
+    return submit_with_retries(entries_data, submit_pass)
+
+def submit_entries_one_by_one(entries_data, journal=None, lookups=None):
+    """
+    Enters entries one at a time on the open registration form.
+    Each entry is journaled as pending before it is touched and with its outcome after.
+    With 'lookups', lookup fields are typed as their cached exact keys.
+    Returns (submitted_client_ids, failed_entries).
+    """
+    from helium import click, Button # The sequence sketched below also needs press, write, TAB and ENTER
+
+    submitted_entry_client_ids = []
+    failed_entries_details = []
+    for index, entry in enumerate(entries_data):
+        client_id = entry.get('id') # This 'id' is the client_id from the TimeEntry object
+        log_message(f"Processing entry {index + 1}/{len(entries_data)} (Client ID: {client_id}): Date {entry.get('Date', 'N/A')}")
+        
+        # Simulate submission attempt for each entry
+        # In a real scenario, this block would contain the Helium calls to fill and submit one entry
+        
+        # ---- START OF PER-ENTRY SUBMISSION LOGIC (Helium interactions) ----
+        entry_started = time.monotonic()
+        failures_before = len(failed_entries_details)
+        if journal:
+            journal.mark_pending([entry])
+        try:
+            # Wait for the 'Hours' button to ensure the form is ready for a new line.
+            if not wait_for(Button("Hours").exists, "new_line"):
+                raise Exception("Timed out waiting for the 'Hours' button.")
+            click(Button("Hours")) # This likely creates a new row or focuses the entry mechanism.
+            wait_for_page_settled("new_line") # Wait for UI to update after click
+
+            # Date processing
+            try:
+                # For Helium's `press` or `write`. Example: "Tue 5/13"
+                formatted_date_for_helium = format_grid_date(parse_entry_date(entry.get('Date')))
+            except ValueError as e_date:
+                log_message(f"Date formatting error for entry {client_id}: {e_date}")
+                raise Exception(str(e_date)) # Make this a failure for this entry
+
+            # Cached exact keys let the lookups be filled without waiting for a search
+            lookup_values = lookups.resolve_entry(entry) if lookups else entry
+            log_message(f"Attempting to input: Date '{formatted_date_for_helium}', Proj '{lookup_values.get('Project', '')}', Act '{lookup_values.get('Activity', '')}', WI '{lookup_values.get('WorkItem', '')}', Hrs '{entry.get('Hours', '')}', Cmt '{entry.get('Comment', '')}'")
+            
+            # Placeholder Helium actions for filling a row
+            # These selectors and sequences are highly dependent on the actual web application
+            # and need to be determined by inspecting the application's HTML structure.
+            
+            # Example sequence:
+            # press(formatted_date_for_helium) # Input Date
+            # press(TAB)
+            # press(TAB) # Assuming two tabs to get to Project from Date
+            # write(lookup_values.get('Project', '')) # Input Project
+            # press(TAB)
+            # write(lookup_values.get('Activity', '')) # Input Activity
+            # press(TAB)
+            # work_item = lookup_values.get('WorkItem', '')
+            # if work_item:
+            #     write(work_item)
+            #     time.sleep(0.5) # Allow for any dynamic updates/validation
+            #     press(ENTER) # If WorkItem is a searchable dropdown
+            #     time.sleep(1) # Wait for selection
+            # press(TAB) # To Hours (assuming it's next after WorkItem or its potential empty slot)
+            # press(TAB) # Assuming 2 tabs from WI to hours if WI could be empty
+            # write(str(entry.get('Hours', '0'))) # Input Hours
+            # press(TAB) # ... and so on for Comment
+            # press(TAB)
+            # press(TAB)
+            # press(TAB)
+            # write(entry.get('Comment', ''))
+            # time.sleep(1) # Short delay before processing next or "saving" this line
+
+            # SIMULATION: For demonstration, let's make every second entry fail.
+            if (index + 1) % 2 != 0: # Odd entries succeed (1st, 3rd, ...)
+                # If actual submission of this line was successful:
+                log_message(f"Successfully processed entry {client_id} (Simulated).")
+                submitted_entry_client_ids.append(client_id)
+                if journal:
+                    journal.mark_submitted(entry)
+            else: # Even entries fail (2nd, 4th, ...)
+                log_message(f"Failed to submit entry {client_id} (Simulated error).")
+                failed_entries_details.append({
+                    "client_id": client_id,
+                    "error": f"Simulated Submission Error for entry {index + 1} (e.g., a rejected WorkItem)."
+                })
+                if journal:
+                    journal.mark_failed(entry, failed_entries_details[-1]["error"])
+        
+        except Exception as e_entry:
+            # Selenium exceptions can have an empty message; the type still says what went wrong
+            error_text = str(e_entry).strip() or type(e_entry).__name__
+            log_message(f"Error during processing of entry {client_id}: {error_text}")
+            failed_entries_details.append({
+                "client_id": client_id,
+                "error": f"Script error: {error_text}"
+            })
+            if journal:
+                journal.mark_failed(entry, failed_entries_details[-1]["error"])
+        record_span("submit_entry", time.monotonic() - entry_started,
+                    ok=len(failed_entries_details) == failures_before, client_id=client_id, mode="single")
+        # ---- END OF PER-ENTRY SUBMISSION LOGIC ----
+
+    return submitted_entry_client_ids, failed_entries_details
+
+def submit_entries_to_xyz(entries_data, mode="single", use_journal=True, retry_in_doubt=False,
+                          retry_rejected=False):
+    """
+    Automates submitting time entries to XYZ.com using Helium.
+    'entries_data' is a list of dictionaries, each representing a time entry.
+    'mode' selects per-entry ("single") or grouped ("batch") entry.
+    'use_journal', 'retry_in_doubt' and 'retry_rejected' are passed to submit_entries_in_session.
+    Returns a dictionary with overall success, submitted IDs, and failed entries with errors.
+    """
+
+    try:
+        log_message("Starting browser session for submission...")
+        start_workspace_session(log_message)
+        return submit_entries_in_session(entries_data, mode=mode, use_journal=use_journal,
+                                         retry_in_doubt=retry_in_doubt, retry_rejected=retry_rejected)
+
+    except Exception as e_global:
+        log_message(f"A critical error occurred in the submission script: {str(e_global)}")
+        return build_critical_failure_result(entries_data, str(e_global))
+    finally:
+        log_message("Submission script attempting to close browser.")
+        close_session(log_message)
+
+def build_critical_failure_result(entries_data, error_message):
+    """Marks every entry as failed when the whole submission run could not proceed."""
+    critical_failed_entries = []
+    for entry in entries_data:
+         critical_failed_entries.append({
+            "client_id": entry.get('id', f"unknown_id_critical_{entries_data.index(entry)}"),
+            "error": f"Critical script error: {error_message}"
+        })
+    return {
+        "overallSuccess": False,
+        "message": f"Python script critical error: {error_message}",
+        "submittedEntryClientIds": [],
+        "failedEntries": critical_failed_entries # All entries marked as failed
+    }
+
+def submit_entries(entries_data, mode="single", use_journal=True, retry_in_doubt=False, retry_rejected=False):
+    """
+    Submits through a running session_daemon.py when there is one, so the warm,
+    already-authenticated browser is reused; otherwise runs a full local session.
+    """
+    daemon_response = run_via_daemon("submit", {
+        "entries": entries_data, "mode": mode, "use_journal": use_journal, "retry_in_doubt": retry_in_doubt,
+        "retry_rejected": retry_rejected,
+    }, log_message)
+    if daemon_response is None:
+        return submit_entries_to_xyz(entries_data, mode=mode, use_journal=use_journal, retry_in_doubt=retry_in_doubt,
+                                     retry_rejected=retry_rejected)
+    if daemon_response.get("ok"):
+        return daemon_response.get("result")
+    log_message(f"Session daemon failed to submit: {daemon_response.get('error')}")
+    return build_critical_failure_result(entries_data, daemon_response.get("error", "Session daemon error"))
+
+def merge_invalid_entries(result_payload, invalid_entries):
+    """Adds entries rejected by input validation to a submission result as failures."""
+    if not invalid_entries:
+        return result_payload
+    failed_entries = invalid_entries + result_payload.get("failedEntries", [])
+    submitted_count = len(result_payload.get("submittedEntryClientIds", []))
+    result_payload = dict(result_payload, overallSuccess=False, failedEntries=failed_entries)
+    if submitted_count:
+        result_payload["message"] = f"Submission complete. {submitted_count} entries submitted, {len(failed_entries)} entries failed."
+    else:
+        result_payload["message"] = f"All {len(failed_entries)} entries failed to submit."
+    return result_payload
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Submit time entries and print a JSON result.")
+    parser.add_argument("entries_json", nargs="?",
+                        help="JSON array of TimeEntry objects ('id' is the client_id). Prefer --input for anything large.")
+    parser.add_argument("--input", metavar="PATH",
+                        help="Read entries from a file, or from stdin with '-', as a JSON array or NDJSON.")
+    parser.add_argument("--mode", choices=SUBMISSION_MODES, default="single",
+                        help="single: one entry per Helium sequence. batch: grouped entry via one script call per batch.")
+    parser.add_argument("--no-journal", action="store_true",
+                        help="Don't consult or update the submission journal (entries are always entered).")
+    parser.add_argument("--retry-in-doubt", action="store_true",
+                        help="Re-enter entries a previous, interrupted run left in doubt.")
+    parser.add_argument("--retry-rejected", action="store_true",
+                        help="Enter entries even if the server recently rejected their Project/Activity/WorkItem.")
+    args = parser.parse_args()
+
+    log_message("Python time submission script started.")
+    tracing.start_run("submit_timesheets")
+    
+    result_payload = {} # Initialize
+    if args.input is not None or args.entries_json is not None:
+        try:
+            # The entries come from Node.js and represent List<TimeEntry>
+            # Crucially, TimeEntry has an 'id' which is the client_id
+            if args.input is not None:
+                entries_list_from_node, invalid_entries = read_entries(args.input)
+                source_description = "stdin" if args.input == "-" else args.input
+            else:
+                entries_list_from_node, invalid_entries = collect_entries(io.StringIO(args.entries_json))
+                source_description = "command line argument"
+            log_message(f"Script received {len(entries_list_from_node) + len(invalid_entries)} entries to submit via {source_description}.")
+            if invalid_entries:
+                log_message(f"{len(invalid_entries)} entries failed validation and will not be submitted.")
+            if entries_list_from_node:
+                # Pass the list of entry objects, which includes their 'id' (client_id)
+                result_payload = submit_entries(entries_list_from_node, mode=args.mode,
+                                                use_journal=not args.no_journal, retry_in_doubt=args.retry_in_doubt,
+                                                retry_rejected=args.retry_rejected)
+            else:
+                result_payload = {"overallSuccess": not invalid_entries, "message": "No entries to submit.",
+                                  "submittedEntryClientIds": [], "failedEntries": []}
+            result_payload = merge_invalid_entries(result_payload, invalid_entries)
+        except (ValueError, OSError) as e:
+            log_message(f"Error reading entries input: {e}")
+            result_payload = {"overallSuccess": False, "message": f"Python script JSON decoding error: {e}", "submittedEntryClientIds": [], "failedEntries": []}
+        except Exception as e_main:
+            log_message(f"An unexpected error occurred in the script's main execution block: {e_main}")
+            result_payload = {"overallSuccess": False, "message": f"Python script unexpected error: {e_main}", "submittedEntryClientIds": [], "failedEntries": []}
+    else:
+        log_message("No time entries data provided to the script. Simulating with placeholder data for script testing.")
+        # Example data if run directly without args (for testing script logic)
+        placeholder_entries = [
+            {"id": "client_id_1", "Date": "2025-05-13", "Project": "Project A", "Activity": "Dev", "WorkItem": "Task 1", "Hours": 1.0, "Comment": "Test 1"},
+            {"id": "client_id_2", "Date": "2025-05-13", "Project": "Project B", "Activity": "Meeting", "WorkItem": "Planning", "Hours": 2.0, "Comment": "Test 2"},
+            {"id": "client_id_3", "Date": "2025-05-14", "Project": "Project C", "Activity": "Testing", "WorkItem": "Bugfix", "Hours": 3.0, "Comment": "Test 3"}
+        ]
+        result_payload = submit_entries(placeholder_entries, mode=args.mode,
+                                        use_journal=not args.no_journal, retry_in_doubt=args.retry_in_doubt,
+                                        retry_rejected=args.retry_rejected)
+        
+    print(json.dumps(result_payload))
+    tracing.finish_run(status="ok" if result_payload.get("overallSuccess") else "failed",
+                       entries_submitted=len(result_payload.get("submittedEntryClientIds", [])),
+                       entries_failed=len(result_payload.get("failedEntries", [])))
+    log_message("Python time submission script finished.")
@@ -0,0 +1,198 @@
+# Structured timing for the automation scripts.
+#
+# Every phase of a run (Chrome start, login wait, grid load, each scroll, each
+# submitted entry, each readiness wait) is timed as a span, WebDriver commands
+# are counted, and a summary record says where the run's time went. Records are
+# JSON objects, one per line:
+#   {"type": "span", "run": ..., "name": ..., "parent": ..., "start_ms": ..., "duration_ms": ..., "ok": ..., ...}
+#   {"type": "summary", "run": ..., "script": ..., "wall_secs": ..., "phases": {...}, "counters": {...}}
+#
+# Output is off unless CHRONOASSIST_TRACE is set: "stderr" writes the records to
+# stderr prefixed with "PYTHON_TRACE: " (how actions.ts collects them), any
+# other value is a file path to append JSON lines to. Timing is recorded either
+# way, so summary() is always available.
+#
+# CHRONOASSIST_PERF_LOG=<path> additionally enables Chrome's DevTools
+# performance log and writes it to <path> as JSON lines when the browser closes.
+
+from contextlib import contextmanager
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+TRACE_ENV = "CHRONOASSIST_TRACE"
+PERF_LOG_ENV = "CHRONOASSIST_PERF_LOG"
+TRACE_PREFIX = "PYTHON_TRACE: "
+WEBDRIVER_CALLS_COUNTER = "webdriver_calls"
+
+_lock = threading.Lock()
+_local = threading.local() # Per-thread stack of open span names
+_run = {
+    "id": None,
+    "script": None,
+    "started": time.monotonic(),
+    "phases": {}, # span name -> {"count", "total_secs", "max_secs", "errors"}
+    "counters": {},
+}
+
+
+def log_message(message):
+    print(f"PYTHON_TRACE_LOG: {message}", file=sys.stderr)
+
+
+def emit(record):
+    """Writes one trace record to the configured destination, if any."""
+    destination = os.environ.get(TRACE_ENV)
+    if not destination:
+        return
+    line = json.dumps(record, default=str)
+    with _lock:
+        if destination == "stderr":
+            print(TRACE_PREFIX + line, file=sys.stderr, flush=True)
+        else:
+            with open(destination, "a", encoding="utf-8") as trace_file:
+                trace_file.write(line + "\n")
+
+
+def start_run(script):
+    """Starts a fresh run: new run id, empty phase totals and counters."""
+    with _lock:
+        _run.update(id=uuid.uuid4().hex[:12], script=script, started=time.monotonic(), phases={}, counters={})
+    emit({"type": "run_start", "run": _run["id"], "script": script, "pid": os.getpid()})
+    return _run["id"]
+
+
+def _span_stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def record_span(name, duration_secs, ok=True, error=None, **attrs):
+    """Records a span measured by the caller, ending now."""
+    stack = _span_stack()
+    with _lock:
+        phase = _run["phases"].setdefault(name, {"count": 0, "total_secs": 0.0, "max_secs": 0.0, "errors": 0})
+        phase["count"] += 1
+        phase["total_secs"] = round(phase["total_secs"] + duration_secs, 3)
+        phase["max_secs"] = round(max(phase["max_secs"], duration_secs), 3)
+        if not ok:
+            phase["errors"] += 1
+    record = {
+        "type": "span",
+        "run": _run["id"],
+        "name": name,
+        "parent": stack[-1] if stack else None,
+        "start_ms": round((time.monotonic() - duration_secs - _run["started"]) * 1000, 1),
+        "duration_ms": round(duration_secs * 1000, 1),
+        "ok": ok,
+    }
+    if error:
+        record["error"] = error
+    record.update(attrs)
+    emit(record)
+
+
+@contextmanager
+def span(name, **attrs):
+    """
+    Times the enclosed block as one span. Spans opened inside it record this one
+    as their parent. An exception marks the span as failed and is re-raised.
+    """
+    stack = _span_stack()
+    started = time.monotonic()
+    stack.append(name)
+    try:
+        yield
+    except BaseException as e_span:
+        stack.pop()
+        record_span(name, time.monotonic() - started, ok=False, error=str(e_span), **attrs)
+        raise
+    stack.pop()
+    record_span(name, time.monotonic() - started, **attrs)
+
+
+def count(name, amount=1):
+    with _lock:
+        _run["counters"][name] = _run["counters"].get(name, 0) + amount
+
+
+def instrument_driver(driver):
+    """
+    Counts every WebDriver command the driver sends, in total and per command
+    (e.g. "webdriver.executeScript"). Safe to call more than once per driver.
+    """
+    original_execute = getattr(driver, "execute", None)
+    if original_execute is None or getattr(driver, "_chronoassist_instrumented", False):
+        return
+
+    def counting_execute(driver_command, params=None):
+        count(WEBDRIVER_CALLS_COUNTER)
+        count(f"webdriver.{driver_command}")
+        return original_execute(driver_command, params)
+
+    driver.execute = counting_execute
+    driver._chronoassist_instrumented = True
+
+
+def merge_summary(other_summary):
+    """
+    Folds another process's summary (e.g. the session daemon's, for a job it ran
+    on our behalf) into this run's phase totals and counters.
+    """
+    with _lock:
+        for name, other in (other_summary.get("phases") or {}).items():
+            phase = _run["phases"].setdefault(name, {"count": 0, "total_secs": 0.0, "max_secs": 0.0, "errors": 0})
+            phase["count"] += other.get("count", 0)
+            phase["total_secs"] = round(phase["total_secs"] + other.get("total_secs", 0.0), 3)
+            phase["max_secs"] = max(phase["max_secs"], other.get("max_secs", 0.0))
+            phase["errors"] += other.get("errors", 0)
+        for name, value in (other_summary.get("counters") or {}).items():
+            _run["counters"][name] = _run["counters"].get(name, 0) + value
+
+
+def summary():
+    """Returns the summary record for the current run."""
+    with _lock:
+        return {
+            "type": "summary",
+            "run": _run["id"],
+            "script": _run["script"],
+            "wall_secs": round(time.monotonic() - _run["started"], 3),
+            "phases": {name: dict(phase) for name, phase in _run["phases"].items()},
+            "counters": dict(_run["counters"]),
+        }
+
+
+def finish_run(**extra):
+    """Emits and returns the run's summary record; extra fields (e.g. status) are added to it."""
+    record = summary()
+    record.update(extra)
+    emit(record)
+    return record
+
+
+def enable_performance_log(driver_options):
+    """Turns on Chrome's DevTools performance log when CHRONOASSIST_PERF_LOG is set."""
+    if os.environ.get(PERF_LOG_ENV):
+        driver_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+def capture_performance_log(driver):
+    """Appends the browser's buffered DevTools performance log to CHRONOASSIST_PERF_LOG, if set."""
+    path = os.environ.get(PERF_LOG_ENV)
+    if not path or driver is None:
+        return
+    try:
+        perf_entries = driver.get_log("performance")
+    except Exception as e_log:
+        log_message(f"Could not read the Chrome performance log: {e_log}")
+        return
+    with open(path, "a", encoding="utf-8") as perf_file:
+        for perf_entry in perf_entries:
+            perf_file.write(json.dumps(dict(perf_entry, run=_run["id"])) + "\n")
+    count("perf_log_entries", len(perf_entries))
+    log_message(f"Wrote {len(perf_entries)} performance log entries to {path}.")
@@ -0,0 +1,395 @@
+# Local mock of the Dynamics 365 timesheet workspace, for exercising the
+# automation scripts without the live tenant.
+#
+# Usage:
+#   python mock_timesheet_server.py [--port 8770] [--rows 200] [--latency-ms 0] [--render-latency-ms 0]
+#   CHRONOASSIST_TARGET_URL=http://127.0.0.1:8770/ python scrape_timesheets.py 30
+#
+# The workspace page has the "Time" heading the scripts wait for, a
+# "Timesheet transactions" grid with the aria-labelled inputs the scraper
+# reads, and a Registration form whose "Hours" button adds entry lines.
+# Entry lines are posted back when edited and can be read from /api/lines.
+#
+# Like the real grid, the transactions grid is virtualized: only the rows in
+# and just around its scroll container's viewport are in the DOM, each with an
+# aria-rowindex, and the grid declares aria-rowcount and the Date column's
+# aria-sort. --render-latency-ms shows the busy indicator for that long before
+# the grid re-renders after a scroll and before a new entry line appears, to
+# mimic a slow tenant. bench_automation.py runs the scripts against this page.
+#
+# Endpoints:
+#   GET  /                   workspace page
+#   GET  /api/transactions   generated transaction rows (JSON)
+#   GET  /api/lines          entry lines recorded by the registration form
+#   POST /api/lines          record or update one entry line
+#   POST /api/reset          clear the recorded entry lines
+#   GET  /data/TimesheetTransactions
+#                            OData stub of the transactions entity for odata_client.py:
+#                            $filter on TransDate (ge/lt), ResourceId and dataAreaId
+#                            (eq), cross-company, $orderby, paging via
+#                            Prefer: odata.maxpagesize and @odata.nextLink
+#
+# The grid holds MOCK_WORKER_ID's lines in MOCK_COMPANY. Like the real entity,
+# the OData stub also holds another worker's lines and lines in another
+# company, so a query that isn't scoped to the worker and company shows it.
+
+import argparse
+from datetime import date, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import json
+import re
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlparse, parse_qs
+
+PROJECTS = ["Project Alpha", "Project Beta", "Project Gamma", "Internal"]
+ACTIVITIES = ["Development", "Meeting", "Testing", "Documentation", "Support"]
+WORK_ITEMS = ["Feature X", "Sprint Planning", "Bug Fixing", "User Manual", "Client Call"]
+ROWS_PER_DAY = 3
+# Worker and company of the logged-in user; the workspace URL is "/?cmp=DAT"
+MOCK_WORKER_ID = "000123"
+MOCK_COMPANY = "dat"
+OTHER_WORKER_ID = "000456"
+OTHER_COMPANY = "usmf"
+
+# Mirrors ODATA_ENTITY_SET / ODATA_FIELD_MAP in odata_client.py (not imported so
+# the mock runs without Helium installed)
+ODATA_ENTITY_SET = "TimesheetTransactions"
+ODATA_FIELD_MAP = {
+    "Date": "TransDate",
+    "Project": "ProjectId",
+    "Activity": "ActivityNumber",
+    "WorkItem": "CategoryId",
+    "Comment": "ExternalComment",
+}
+ODATA_WORKER_PROPERTY = "ResourceId"
+ODATA_COMPANY_PROPERTY = "dataAreaId"
+ODATA_DEFAULT_PAGE_SIZE = 1000
+ODATA_FILTER_PATTERN = re.compile(r"TransDate (ge|lt) (\d{4}-\d{2}-\d{2})")
+ODATA_EQ_FILTER_PATTERN = re.compile(r"(ResourceId|dataAreaId) eq '((?:[^']|'')*)'")
+
+WORKSPACE_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>Timesheets (mock)</title>
+  <style>
+    body { font-family: sans-serif; font-size: 12px; }
+    [role='row'] { display: flex; gap: 4px; margin-bottom: 2px; }
+    [role='row'] input { width: 140px; }
+    #transactions-scroller { height: 480px; overflow-y: auto; }
+    #transactions-body { position: relative; }
+    #transactions-body [role='row'] { position: absolute; left: 0; height: 24px; margin: 0; }
+    #spinner { position: fixed; top: 0; right: 0; background: #ccc; padding: 4px; }
+  </style>
+</head>
+<body>
+  <h1>Time</h1>
+  <nav>
+    <button type="button" aria-label="Registration">Registration</button>
+    <button type="button" id="registration-open">Registration</button>
+    <a href="#" id="transactions-link">Timesheet transactions</a>
+  </nav>
+  <div id="spinner" class="appBusyIndicator" hidden>Loading...</div>
+  <section id="transactions" hidden>
+    <div id="transactions-scroller">
+      <div id="transactions-grid" role="grid" aria-label="Timesheet transactions">
+        <div role="row" aria-rowindex="1" id="transactions-header"></div>
+        <div id="transactions-body"></div>
+      </div>
+    </div>
+  </section>
+  <section id="registration" hidden>
+    <button type="button" aria-label="Hours">Hours</button>
+    <div id="lines" role="grid" aria-label="Lines"></div>
+  </section>
+  <script>
+    var COLUMNS = ["Date", "Project", "Activity", "Work item", "Hours", "External comment"];
+    var FIELDS = ["Date", "Project", "Activity", "WorkItem", "Hours", "Comment"];
+    var CONFIG = __MOCK_CONFIG__;
+    var ROW_HEIGHT = 24; // Matches the CSS, so the rendered window follows from scrollTop
+    var OVERSCAN_ROWS = 5;
+    var spinner = document.getElementById("spinner");
+    var scroller = document.getElementById("transactions-scroller");
+    var transactions = [];
+    var renderTimer = null;
+    var lineCount = 0;
+
+    // Shows the busy indicator for the configured render latency, then runs render
+    function afterRenderLatency(render) {
+      if (!CONFIG.renderLatencyMs) { return render(); }
+      spinner.hidden = false;
+      clearTimeout(renderTimer);
+      renderTimer = setTimeout(function () { render(); spinner.hidden = true; }, CONFIG.renderLatencyMs);
+    }
+
+    function makeRow(values, readOnly) {
+      var row = document.createElement("div");
+      row.setAttribute("role", "row");
+      for (var c = 0; c < COLUMNS.length; c++) {
+        var cell = document.createElement("div");
+        cell.setAttribute("role", "gridcell");
+        var input = document.createElement("input");
+        input.setAttribute("aria-label", COLUMNS[c]);
+        input.value = values ? values[c] : "";
+        input.readOnly = readOnly;
+        cell.appendChild(input);
+        row.appendChild(cell);
+      }
+      return row;
+    }
+
+    function formatDate(iso) {
+      var parts = iso.split("-");
+      return parseInt(parts[1], 10) + "/" + parseInt(parts[2], 10) + "/" + parts[0];
+    }
+
+    function renderHeader() {
+      var header = document.getElementById("transactions-header");
+      header.innerHTML = "";
+      COLUMNS.forEach(function (label) {
+        var cell = document.createElement("div");
+        cell.setAttribute("role", "columnheader");
+        cell.setAttribute("aria-label", label);
+        if (label === "Date") { cell.setAttribute("aria-sort", "descending"); }
+        cell.textContent = label;
+        header.appendChild(cell);
+      });
+    }
+
+    // Renders only the rows in (and OVERSCAN_ROWS around) the scroller's viewport
+    function renderViewport() {
+      var body = document.getElementById("transactions-body");
+      var first = Math.max(0, Math.floor(scroller.scrollTop / ROW_HEIGHT) - OVERSCAN_ROWS);
+      var last = Math.min(transactions.length, Math.ceil((scroller.scrollTop + scroller.clientHeight) / ROW_HEIGHT) + OVERSCAN_ROWS);
+      body.innerHTML = "";
+      for (var i = first; i < last; i++) {
+        var r = transactions[i];
+        var row = makeRow([formatDate(r.Date), r.Project, r.Activity, r.WorkItem, r.Hours, r.Comment], true);
+        row.setAttribute("aria-rowindex", String(i + 2)); // Row 1 is the header
+        row.style.top = (i * ROW_HEIGHT) + "px";
+        body.appendChild(row);
+      }
+    }
+
+    document.getElementById("transactions-link").addEventListener("click", function (event) {
+      event.preventDefault();
+      document.getElementById("registration").hidden = true;
+      document.getElementById("transactions").hidden = false;
+      spinner.hidden = false;
+      fetch("/api/transactions").then(function (r) { return r.json(); }).then(function (rows) {
+        transactions = rows;
+        document.getElementById("transactions-grid").setAttribute("aria-rowcount", String(rows.length + 1));
+        document.getElementById("transactions-body").style.height = (rows.length * ROW_HEIGHT) + "px";
+        scroller.scrollTop = 0;
+        renderHeader();
+        renderViewport();
+        spinner.hidden = true;
+      });
+    });
+
+    scroller.addEventListener("scroll", function () { afterRenderLatency(renderViewport); });
+
+    document.querySelectorAll("nav button").forEach(function (button) {
+      button.addEventListener("click", function () {
+        document.getElementById("transactions").hidden = true;
+        document.getElementById("registration").hidden = false;
+      });
+    });
+
+    document.querySelector("#registration button").addEventListener("click", function () {
+      var lineId = ++lineCount;
+      afterRenderLatency(function () {
+        var row = makeRow(null, false);
+        row.addEventListener("change", function () {
+          var line = {line: lineId};
+          row.querySelectorAll("input").forEach(function (input, c) { line[FIELDS[c]] = input.value; });
+          fetch("/api/lines", {method: "POST", headers: {"Content-Type": "application/json"}, body: JSON.stringify(line)});
+        });
+        document.getElementById("lines").appendChild(row);
+      });
+    });
+  </script>
+</body>
+</html>
+"""
+
+
+def log_message(message):
+    print(f"PYTHON_MOCK_LOG: {message}", file=sys.stderr)
+
+
+def generate_transactions(row_count, today=None, worker=MOCK_WORKER_ID, company=MOCK_COMPANY):
+    """Deterministic transaction rows of one worker in one company, newest first, ROWS_PER_DAY per day."""
+    today = today or date.today()
+    rows = []
+    for i in range(row_count):
+        day = today - timedelta(days=1 + i // ROWS_PER_DAY)
+        rows.append({
+            "Date": day.isoformat(),
+            "Project": PROJECTS[i % len(PROJECTS)],
+            "Activity": ACTIVITIES[i % len(ACTIVITIES)],
+            "WorkItem": WORK_ITEMS[(i * 7) % len(WORK_ITEMS)],
+            "Hours": str(1 + i % 4),
+            "Comment": f"Mock row {i}",
+            "Worker": worker,
+            "Company": company,
+        })
+    return rows
+
+
+class MockTimesheetState:
+    """Data served by one mock server instance."""
+
+    def __init__(self, row_count=200, latency_ms=0, odata_cookie=None, render_latency_ms=0):
+        self.transactions = generate_transactions(row_count)
+        # Only reachable through OData: lines the user's grid never shows
+        self.other_transactions = (generate_transactions(row_count, worker=OTHER_WORKER_ID)
+                                   + generate_transactions(row_count, company=OTHER_COMPANY))
+        self.latency_ms = latency_ms
+        # Client-side delay before the grid re-renders or a new entry line appears
+        self.render_latency_ms = render_latency_ms
+        # "name=value" the OData endpoint requires in the Cookie header (None: no auth)
+        self.odata_cookie = odata_cookie
+        self.odata_requests = 0
+        self.lines = {}
+        self.lock = threading.Lock()
+
+
+def query_odata(transactions, query, page_size):
+    """
+    Applies an OData query (parsed query string) to the transactions.
+
+    Returns:
+        tuple: (rows in OData property names, skip value of the next page or None)
+    """
+    odata_filter = query.get("$filter", [""])[0]
+    if query.get("cross-company", [""])[0].lower() == "true":
+        rows = transactions
+    else:
+        rows = [row for row in transactions if row["Company"] == MOCK_COMPANY] # The account's default company
+    for odata_property, value in ODATA_EQ_FILTER_PATTERN.findall(odata_filter):
+        value = value.replace("''", "'")
+        if odata_property == ODATA_WORKER_PROPERTY:
+            rows = [row for row in rows if row["Worker"] == value]
+        else:
+            rows = [row for row in rows if row["Company"] == value.lower()]
+    for operator, value in ODATA_FILTER_PATTERN.findall(odata_filter):
+        if operator == "ge":
+            rows = [row for row in rows if row["Date"] >= value]
+        else:
+            rows = [row for row in rows if row["Date"] < value]
+    descending = query.get("$orderby", ["TransDate desc"])[0].endswith("desc")
+    rows = sorted(rows, key=lambda row: row["Date"], reverse=descending)
+    skip = int(query.get("$skiptoken", ["0"])[0])
+    page = rows[skip:skip + page_size]
+    next_skip = skip + page_size if skip + page_size < len(rows) else None
+    odata_rows = [dict({odata_property: row[field] + ("T12:00:00Z" if field == "Date" else "")
+                        for field, odata_property in ODATA_FIELD_MAP.items()},
+                       **{ODATA_WORKER_PROPERTY: row["Worker"], ODATA_COMPANY_PROPERTY: row["Company"]})
+                  for row in page]
+    return odata_rows, next_skip
+
+
+def render_workspace_page(state):
+    config = {"renderLatencyMs": state.render_latency_ms}
+    return WORKSPACE_PAGE.replace("__MOCK_CONFIG__", json.dumps(config))
+
+
+def make_handler(state):
+    class MockTimesheetHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass # Keep stderr for the scripts' own logs
+
+        def send_json(self, payload, status=200):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if state.latency_ms:
+                time.sleep(state.latency_ms / 1000)
+            path = self.path.split("?", 1)[0]
+            if path == "/":
+                body = render_workspace_page(state).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            elif path == "/api/transactions":
+                self.send_json(state.transactions)
+            elif path == "/api/lines":
+                with state.lock:
+                    self.send_json([state.lines[key] for key in sorted(state.lines)])
+            elif path == f"/data/{ODATA_ENTITY_SET}":
+                self.send_odata_page()
+            else:
+                self.send_json({"error": "Not found"}, status=404)
+
+        def send_odata_page(self):
+            state.odata_requests += 1
+            if state.odata_cookie and state.odata_cookie not in (self.headers.get("Cookie") or "").split("; "):
+                self.send_json({"error": {"code": "Unauthorized"}}, status=401)
+                return
+            query = parse_qs(urlparse(self.path).query)
+            prefer = re.search(r"odata\.maxpagesize=(\d+)", self.headers.get("Prefer") or "")
+            page_size = int(prefer.group(1)) if prefer else ODATA_DEFAULT_PAGE_SIZE
+            rows, next_skip = query_odata(state.transactions + state.other_transactions, query, page_size)
+            payload = {"@odata.context": f"/data/$metadata#{ODATA_ENTITY_SET}", "value": rows}
+            if next_skip is not None:
+                next_query = {key: values[0] for key, values in query.items()}
+                next_query["$skiptoken"] = str(next_skip)
+                payload["@odata.nextLink"] = f"/data/{ODATA_ENTITY_SET}?{urlencode(next_query)}"
+            self.send_json(payload)
+
+        def do_POST(self):
+            path = self.path.split("?", 1)[0]
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if path == "/api/lines":
+                with state.lock:
+                    state.lines[payload.get("line")] = payload
+                self.send_json({"ok": True})
+            elif path == "/api/reset":
+                with state.lock:
+                    state.lines.clear()
+                self.send_json({"ok": True})
+            else:
+                self.send_json({"error": "Not found"}, status=404)
+
+    return MockTimesheetHandler
+
+
+def start_mock_server(port=0, row_count=200, latency_ms=0, odata_cookie=None, render_latency_ms=0):
+    """Starts the mock server on a background thread. Returns (server, base_url)."""
+    state = MockTimesheetState(row_count=row_count, latency_ms=latency_ms, odata_cookie=odata_cookie,
+                               render_latency_ms=render_latency_ms)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a local mock of the timesheet workspace.")
+    parser.add_argument("--port", type=int, default=8770)
+    parser.add_argument("--rows", type=int, default=200, help="Number of transaction rows to generate.")
+    parser.add_argument("--latency-ms", type=int, default=0, help="Delay added to every GET request.")
+    parser.add_argument("--render-latency-ms", type=int, default=0,
+                        help="Delay before the grid re-renders after a scroll or a new entry line appears.")
+    parser.add_argument("--odata-cookie", metavar="NAME=VALUE", help="Cookie the OData endpoint requires (default: none).")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(port=args.port, row_count=args.rows, latency_ms=args.latency_ms,
+                                         odata_cookie=args.odata_cookie, render_latency_ms=args.render_latency_ms)
+    log_message(f"Mock timesheet workspace at {base_url} ({args.rows} rows, {args.latency_ms}ms latency, "
+                f"{args.render_latency_ms}ms render latency).")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
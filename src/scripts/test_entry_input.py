@@ -0,0 +1,73 @@
+# Checks for the chunked JSON / NDJSON reader in entry_input.py.
+#
+# Run from src/scripts: python -m unittest test_entry_input (or pytest).
+# Most cases read with tiny chunks so values and separators straddle chunk
+# boundaries, which is where a hand-written streaming parser goes wrong.
+
+import io
+import json
+import unittest
+
+from chronoassist.entry_input import iter_json_values, collect_entries
+
+
+def parse(text, chunk_chars=3):
+    return list(iter_json_values(io.StringIO(text), chunk_chars=chunk_chars))
+
+
+def make_entry(client_id, **overrides):
+    entry = {"id": client_id, "Date": "2025-05-13", "Project": "Project A", "Activity": "Dev",
+             "WorkItem": "Task 1", "Hours": 1.5, "Comment": ""}
+    entry.update(overrides)
+    return entry
+
+
+class IterJsonValuesTest(unittest.TestCase):
+
+    def test_array_across_every_chunk_size(self):
+        values = [{"a": 1, "text": "x" * 10}, [1, 2], "s,]", 12345, None, True]
+        text = json.dumps(values)
+        for chunk_chars in range(1, len(text) + 2):
+            self.assertEqual(parse(text, chunk_chars), values, chunk_chars)
+
+    def test_ndjson_and_concatenated_values(self):
+        self.assertEqual(parse('{"a": 1}\n{"a": 2}\n\n{"a": 3}'), [{"a": 1}, {"a": 2}, {"a": 3}])
+        self.assertEqual(parse('{"a":1}{"a":2}'), [{"a": 1}, {"a": 2}])
+
+    def test_numbers_split_at_a_chunk_boundary(self):
+        self.assertEqual(parse("12345\n678", chunk_chars=2), [12345, 678])
+
+    def test_empty_inputs(self):
+        self.assertEqual(parse(""), [])
+        self.assertEqual(parse(" \n "), [])
+        self.assertEqual(parse("[ ]"), [])
+
+    def test_rejects_trailing_comma(self):
+        with self.assertRaisesRegex(ValueError, "after ','"):
+            parse('[{"a":1},]')
+        with self.assertRaisesRegex(ValueError, "after ','"):
+            parse('[1, ]', chunk_chars=1)
+
+    def test_rejects_malformed_arrays(self):
+        for text in ('[1 2]', '[1,,2]', '[,1]', '[1, 2', '[{"a": 1}', '[1] 2', '{"a": '):
+            with self.assertRaises(ValueError, msg=text):
+                parse(text)
+
+
+class CollectEntriesTest(unittest.TestCase):
+
+    def test_empty_work_item_is_accepted(self):
+        entries, invalid_entries = collect_entries(io.StringIO(json.dumps([make_entry("c1", WorkItem="")])))
+        self.assertEqual([entry["id"] for entry in entries], ["c1"])
+        self.assertEqual(invalid_entries, [])
+
+    def test_invalid_entries_are_reported_without_rejecting_the_rest(self):
+        text = "\n".join(json.dumps(entry) for entry in [
+            make_entry("c1", Date="5/13/2025"), make_entry("c2", Project=""), make_entry("c3", Date="13/05/2025"), 7])
+        entries, invalid_entries = collect_entries(io.StringIO(text))
+        self.assertEqual([(entry["id"], entry["Date"]) for entry in entries], [("c1", "2025-05-13")])
+        self.assertEqual([failure["client_id"] for failure in invalid_entries], ["c2", "c3", "unknown_id_3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
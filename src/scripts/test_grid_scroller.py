@@ -0,0 +1,111 @@
+# Checks for the viewport scanning loop in grid_scroller.py.
+#
+# Run from src/scripts: python -m unittest test_grid_scroller (or pytest).
+# The browser calls (read_viewport, scroll_one_viewport and the settle wait)
+# are replaced by a FakeGrid that serves a fixed list of rows a few at a time.
+
+from datetime import datetime, timedelta
+import unittest
+from unittest import mock
+
+from chronoassist import grid_scroller
+from chronoassist.grid_scroller import iter_grid_viewports, new_coverage
+
+CUTOFF = datetime(2025, 5, 10)
+
+
+def make_rows(days, start_index=1):
+    """(aria-rowindex, values) for one row per day offset from the cutoff."""
+    return [(str(start_index + i), ((CUTOFF + timedelta(days=day)).strftime("%m/%d/%Y"), "P", "A", "W", f"c{i}"))
+            for i, day in enumerate(days)]
+
+
+class FakeGrid:
+    """Serves rows viewport_size at a time; scrolling past the last row moves 0 px."""
+
+    def __init__(self, rows, viewport_size=3, step=None, sort=None, stuck_after=None):
+        self.rows = rows
+        self.viewport_size = viewport_size
+        self.step = step or viewport_size # Rows moved per scroll; less than a viewport overlaps them
+        self.sort = sort
+        self.stuck_after = stuck_after # Scrolls "move" but the rows stop changing from this offset on
+        self.offset = 0
+
+    def read_viewport(self, extraction_mode="js"):
+        rows = self.rows[self.offset:self.offset + self.viewport_size]
+        return {"rows": rows, "totalRows": len(self.rows), "sort": self.sort}
+
+    def scroll_one_viewport(self):
+        if self.stuck_after is not None and self.offset >= self.stuck_after:
+            return 100
+        if self.offset + self.viewport_size >= len(self.rows):
+            return 0
+        self.offset += self.step
+        return 100
+
+
+def scan(grid, cutoff_date=CUTOFF):
+    coverage = new_coverage()
+    with mock.patch.object(grid_scroller, "read_viewport", grid.read_viewport), \
+            mock.patch.object(grid_scroller, "scroll_one_viewport", grid.scroll_one_viewport), \
+            mock.patch.object(grid_scroller, "wait_for_page_settled"):
+        rows = [row for viewport_rows in iter_grid_viewports(coverage, cutoff_date=cutoff_date)
+                for row in viewport_rows]
+    return rows, coverage
+
+
+class IterGridViewportsTest(unittest.TestCase):
+
+    def test_header_descending_stops_at_the_cutoff(self):
+        rows, coverage = scan(FakeGrid(make_rows([5, 4, 3, 2, 1, 0, -1, -2, -3, -4, -5, -6]), sort="descending"))
+        self.assertEqual(coverage["stop_reason"], "cutoff")
+        self.assertEqual(coverage["sort_order_source"], "header")
+        self.assertEqual(len(rows), 9) # The viewport holding the first too-old row, then no more
+        self.assertTrue(coverage["complete"])
+
+    def test_inferred_descending_reads_to_the_end(self):
+        # Looks newest first until the out-of-order rows after the cutoff
+        rows, coverage = scan(FakeGrid(make_rows([5, 4, 3, 2, 1, 0, -1, -2, -3, 7, 6, 8])))
+        self.assertEqual(coverage["stop_reason"], "end_of_grid")
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(coverage["sort_order"], "unsorted")
+        self.assertTrue(coverage["complete"])
+
+    def test_unsorted_grid_is_read_to_the_end(self):
+        days = [3, -2, 5, 0, -7, 1, 8, -1]
+        rows, coverage = scan(FakeGrid(make_rows(days)))
+        self.assertEqual(coverage["stop_reason"], "end_of_grid")
+        self.assertEqual([row[0][4] for row in rows], [f"c{i}" for i in range(len(days))])
+        self.assertEqual(coverage["rows_before_cutoff"], 3)
+        self.assertEqual(coverage["sort_order"], "unsorted")
+        self.assertTrue(coverage["complete"])
+
+    def test_overlapping_viewports_yield_each_row_once(self):
+        rows, coverage = scan(FakeGrid(make_rows([4, 3, 2, 1, 0, -1]), viewport_size=4, step=2))
+        self.assertEqual([row[0][4] for row in rows], ["c0", "c1", "c2", "c3", "c4", "c5"])
+        self.assertEqual(coverage["rows_seen"], 6)
+
+    def test_stalled_grid_is_incomplete(self):
+        rows, coverage = scan(FakeGrid(make_rows([9, 8, 7, 6, 5, 4, 3, 2, 1]), stuck_after=3))
+        self.assertEqual(coverage["stop_reason"], "stalled")
+        self.assertEqual(coverage["stalled_viewports"], grid_scroller.MAX_STALLED_VIEWPORTS)
+        self.assertEqual(len(rows), 6)
+        self.assertFalse(coverage["complete"])
+
+    def test_missing_row_indexes_make_the_scan_incomplete(self):
+        grid_rows = make_rows([5, 4, 3, 2, 1, 0])
+        del grid_rows[2:4] # Rows 3 and 4 were never rendered
+        rows, coverage = scan(FakeGrid(grid_rows))
+        self.assertEqual(coverage["stop_reason"], "end_of_grid")
+        self.assertEqual(coverage["missing_row_indexes"], 2)
+        self.assertFalse(coverage["complete"])
+
+    def test_empty_grid_is_incomplete(self):
+        rows, coverage = scan(FakeGrid([]))
+        self.assertEqual(rows, [])
+        self.assertEqual(coverage["stop_reason"], "no_rows")
+        self.assertFalse(coverage["complete"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,17 @@
+// Summary record written by src/scripts/tracing.py at the end of each automation script run.
+export interface AutomationPhaseTiming {
+  count: number;
+  total_secs: number;
+  max_secs: number;
+  errors: number;
+}
+
+export interface AutomationRunSummary {
+  type: 'summary';
+  run: string;
+  script: string;
+  wall_secs: number;
+  phases: Record<string, AutomationPhaseTiming>;
+  counters: Record<string, number>;
+  status?: string;
+}